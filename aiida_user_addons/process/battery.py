@@ -1,22 +1,55 @@
 """
 Module with battery related processes
 """
+import os
+from collections import Counter
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 from aiida.engine import calcfunction
+from aiida import orm
 from aiida.orm import Float, StructureData
-from ase.build import sort
 from bsym.interface.pymatgen import unique_structure_substitutions
 from pymatgen.analysis.ewald import EwaldSummation
 from pymatgen.analysis.phase_diagram import CompoundPhaseDiagram
 from pymatgen.analysis.reaction_calculator import Reaction
 from pymatgen.core import Composition, Element, Structure
 from pymatgen.entries import Entry
+from pymatgen.io.ase import AseAtomsAdaptor
 
 from aiida_user_addons.common.misc import get_energy_from_misc
 
 __version__ = "0.0.1"
 
+# Keys checked when deciding whether two calculations are comparable
+_COMPARABLE_CRITICAL_KEYS = ("encut", "lreal", "prec", "gga")
+_COMPARABLE_WARN_KEYS = ("ismear", "sigma")
+
+
+@lru_cache(maxsize=256)
+def _composition_from_structure_data_pk(pk):
+    """Composition of a stored StructureData, memoized by pk."""
+    structure = orm.load_node(pk)
+    try:
+        # Count the kind symbols directly - much cheaper than a full
+        # site-by-site pymatgen structure reconstruction
+        kind_symbols = {kind.name: kind.symbol for kind in structure.kinds}
+        counts = Counter(kind_symbols[site.kind_name] for site in structure.sites)
+        return Composition(counts)
+    except ValueError:
+        # Multi-species kinds - fall back to the full conversion
+        return structure.get_pymatgen().composition
+
+
+def _composition_from_structure_data(structure_data) -> Composition:
+    """Extract the composition of a StructureData without a pymatgen round-trip."""
+    if structure_data.pk is None:
+        # Unstored nodes cannot be keyed by pk
+        return structure_data.get_pymatgen().composition
+    return _composition_from_structure_data_pk(structure_data.pk)
+
 
 @calcfunction
 def compute_li_voltage(
@@ -33,11 +66,11 @@ def compute_li_voltage(
     Structures are only used for extracting the composition.
     """
 
-    lith_comp = lithiated_structure.get_pymatgen().composition
+    lith_comp = _composition_from_structure_data(lithiated_structure)
     lith_eng = get_energy_from_misc(lithiated_res)
-    deli_comp = delithiated_structure.get_pymatgen().composition
+    deli_comp = _composition_from_structure_data(delithiated_structure)
     deli_eng = get_energy_from_misc(delithiated_res)
-    li_comp = li_ref_structure.get_pymatgen().composition
+    li_comp = _composition_from_structure_data(li_ref_structure)
     li_eng = get_energy_from_misc(li_ref_res)
 
     reaction = Reaction([lith_comp], [li_comp, deli_comp])
@@ -96,16 +129,20 @@ def compute_li_voltage_shortcut(
     )
 
 
+def _select_incar_subdict(input_dict):
+    """Return the sub-dict holding the INCAR tags ('vasp' or 'incar' namespace)."""
+    if "vasp" in input_dict:
+        return input_dict["vasp"]
+    if "incar" in input_dict:
+        return input_dict["incar"]
+    return input_dict
+
+
 def _get_incar_tag(tag, input_dict):
     """
     Obtain incar tag from dict. Handle special cases. Return value in lowercase.
     """
-    if "vasp" in input_dict:
-        input_dict = input_dict["vasp"]
-    elif "incar" in input_dict:
-        input_dict = input_dict["incar"]
-
-    value = input_dict.get(tag)
+    value = _select_incar_subdict(input_dict).get(tag)
     # Special case the GGA tag - None is pe
     if (tag == "gga") and (value is None):
         return "pe"
@@ -114,130 +151,221 @@ def _get_incar_tag(tag, input_dict):
     return value
 
 
-def _obtain_li_ref_calc(encut, gga, group_name="li-metal-refs"):
+@lru_cache(maxsize=8)
+def _li_ref_index(group_name="li-metal-refs"):
     """
-    Return the reference calculation for Li metal
+    Build an index of the Li metal reference calculations in a group.
 
-    WARNING: This works for only calculation performed using PBE pseudopotentials
-    """
-    from aiida.orm import Dict, Group, QueryBuilder, WorkChainNode
+    A single QueryBuilder call fetches the (encut, gga) pairs of all successful
+    workchains in the group, which is then indexed in Python. This avoids
+    issuing one multi-join traversal per lookup key - the reference set rarely
+    changes, so the index is memoized per group name.
 
-    if gga is None:
-        gga = "pe"
-    qdb = QueryBuilder()
-    qdb.append(Group, filters={"label": group_name})
+    Returns:
+        A dict mapping ``(encut, gga)`` to the pk of the workchain.
+    """
+    qdb = orm.QueryBuilder()
+    qdb.append(orm.Group, filters={"label": group_name})
     qdb.append(
-        WorkChainNode,
-        with_group=Group,
+        orm.WorkChainNode,
+        with_group=orm.Group,
         filters={"attributes.exit_status": 0},
-        project=["*"],
+        project=["id"],
     )
     qdb.append(
-        Dict,
-        with_outgoing=WorkChainNode,
-        filters={
-            "or": [
-                {"attributes.vasp.encut": encut, "attributes.vasp.gga": gga},
-                {"attributes.incar.encut": encut, "attributes.incar.gga": gga},
-            ]
-        },
+        orm.Dict,
+        with_outgoing=orm.WorkChainNode,
+        project=[
+            "attributes.vasp.encut",
+            "attributes.vasp.gga",
+            "attributes.incar.encut",
+            "attributes.incar.gga",
+        ],
         edge_filters={"label": "parameters"},
     )
 
-    matches = qdb.all()
-    if len(matches) > 1:
-        print(f"WARNING: more than one matches found for gga:{gga} encut:{encut}")
-    if len(matches) == 0:
+    index = {}
+    for pk, vasp_encut, vasp_gga, incar_encut, incar_gga in qdb.all():
+        encut = vasp_encut if vasp_encut is not None else incar_encut
+        gga = vasp_gga if vasp_gga is not None else incar_gga
+        if gga is None:
+            gga = "pe"
+        key = (encut, gga)
+        if key in index:
+            print(f"WARNING: more than one matches found for gga:{gga} encut:{encut}")
+            continue
+        index[key] = pk
+    return index
+
+
+def _obtain_li_ref_calc(encut, gga, group_name="li-metal-refs"):
+    """
+    Return the reference calculation for Li metal
+
+    WARNING: This works for only calculation performed using PBE pseudopotentials
+    """
+    if gga is None:
+        gga = "pe"
+    index = _li_ref_index(group_name)
+    if (encut, gga) not in index:
         raise RuntimeError(f"ERROR: No matche found for gga:{gga} encut:{encut}")
-    return matches[0][0]
+    # Only the pk is indexed - reload the node to avoid holding stale ORM sessions
+    return orm.load_node(index[(encut, gga)])
 
 
-def check_li_ref_calc(encut, gga, group_name="li-metal-refs"):
-    from aiida.orm import Dict, Group, QueryBuilder, WorkChainNode
+_obtain_li_ref_calc.cache_clear = _li_ref_index.cache_clear
 
+
+def check_li_ref_calc(encut, gga, group_name="li-metal-refs"):
     if gga is None:
         gga = "pe"
-    q = QueryBuilder()
-    q.append(Group, filters={"label": group_name})
-    q.append(
-        WorkChainNode,
-        with_group=Group,
-        filters={"attributes.exit_status": 0},
-        project=["*"],
-    )
-    q.append(
-        Dict,
-        with_outgoing=WorkChainNode,
-        filters={
-            "or": [
-                {"attributes.vasp.encut": encut, "attributes.vasp.gga": gga},
-                {"attributes.incar.encut": encut, "attributes.incar.gga": gga},
-            ]
-        },
-        edge_filters={"label": "parameters"},
-    )
+    return (encut, gga) in _li_ref_index(group_name)
 
-    nmatch = q.count()
-    if nmatch > 1:
-        print(f"WARNING: more than one matches found for gga:{gga} encut:{encut}")
-        return True
-    if nmatch == 1:
-        return True
-    if nmatch == 0:
-        return False
 
+check_li_ref_calc.cache_clear = _li_ref_index.cache_clear
 
-def list_li_ref_calcs(group_name="li-metal-refs"):
-    """Return the reference calculation for Li metal"""
-    from aiida.orm import Dict, Group, QueryBuilder, WorkChainNode
 
-    qdb = QueryBuilder()
-    qdb.append(Group, filters={"label": group_name})
-    qdb.append(WorkChainNode, with_group=Group, project=["*"])
+def list_li_ref_calcs(group_name="li-metal-refs", fields=None, pks_only=False):
+    """
+    Iterate over the reference calculations for Li metal
+
+    Only the scalar encut/gga attributes are projected by default to avoid
+    streaming the full parameters dict for every row - pass ``fields`` to
+    select a different projection (e.g. ``['attributes.vasp']``). Results are
+    streamed in batches rather than materialized at once; wrap in ``list()``
+    if a list is needed. Set ``pks_only`` to project just the workchain pk
+    instead of loading the full node.
+    """
+    if fields is None:
+        fields = [
+            "attributes.vasp.encut",
+            "attributes.vasp.gga",
+            "attributes.incar.encut",
+            "attributes.incar.gga",
+        ]
+    qdb = orm.QueryBuilder()
+    qdb.append(orm.Group, filters={"label": group_name})
     qdb.append(
-        Dict,
-        with_outgoing=WorkChainNode,
-        project=["attributes.vasp"],
+        orm.WorkChainNode,
+        with_group=orm.Group,
+        project=["id"] if pks_only else ["*"],
+    )
+    qdb.append(
+        orm.Dict,
+        with_outgoing=orm.WorkChainNode,
+        project=fields,
         edge_filters={"label": "parameters"},
     )
 
+    yield from qdb.iterall(batch_size=200)
+
+
+@lru_cache(maxsize=1024)
+def _parameters_dict_pk(calc_pk):
+    """Return the pk of the parameters Dict node linked to a calculation."""
+    qdb = orm.QueryBuilder()
+    qdb.append(orm.Node, filters={"id": calc_pk}, tag="calc")
+    qdb.append(
+        orm.Dict, with_outgoing="calc", edge_filters={"label": "parameters"}, project=["id"]
+    )
     matches = qdb.all()
-    return matches
-
-
-def _is_comparable(calc1, calc2):
-    """Check wether two calculations can be compared"""
-    critical_keys = ["encut", "lreal", "prec", "gga"]
-    warn_keys = ["ismear", "sigma"]
-    indict1 = get_input_parameters_dict(calc1.outputs.misc)
-    indict2 = get_input_parameters_dict(calc2.outputs.misc)
-    for key in critical_keys:
-        v1 = _get_incar_tag(key, indict1)
-        v2 = _get_incar_tag(key, indict2)
+    if len(matches) == 1:
+        return matches[0][0]
+    return None
+
+
+def _is_comparable(calc1, calc2, indict1=None, indict2=None):
+    """
+    Check wether two calculations can be compared
+
+    The parameter dicts may be passed explicitly (e.g. prefetched in batch
+    with `get_input_parameters_dicts`) - otherwise both are fetched with a
+    single QueryBuilder call.
+    """
+    if indict1 is None and indict2 is None:
+        # Calculations sharing the same parameters Dict node (e.g. a reused
+        # INCAR template) are trivially comparable - skip the per-key scan
+        pk1 = _parameters_dict_pk(calc1.pk)
+        if pk1 is not None and pk1 == _parameters_dict_pk(calc2.pk):
+            return True
+    if indict1 is None or indict2 is None:
+        misc1 = calc1.outputs.misc
+        misc2 = calc2.outputs.misc
+        fetched = get_input_parameters_dicts([misc1, misc2])
+        if indict1 is None:
+            indict1 = fetched[misc1.pk]
+        if indict2 is None:
+            indict2 = fetched[misc2.pk]
+    # Resolve the INCAR namespace once per calc instead of once per key
+    sub1 = _select_incar_subdict(indict1)
+    sub2 = _select_incar_subdict(indict2)
+    for key in _COMPARABLE_CRITICAL_KEYS + _COMPARABLE_WARN_KEYS:
+        v1 = sub1.get(key)
+        v2 = sub2.get(key)
+        if key == "gga":
+            v1 = "pe" if v1 is None else v1
+            v2 = "pe" if v2 is None else v2
+        if isinstance(v1, str):
+            v1 = v1.lower()
+        if isinstance(v2, str):
+            v2 = v2.lower()
         if v1 != v2:
-            print(f"Critical key mismatch {key} - {v1} vs {v2}")
-            return False
-    for key in warn_keys:
-        if _get_incar_tag(key, indict1) != _get_incar_tag(key, indict2):
+            if key in _COMPARABLE_CRITICAL_KEYS:
+                print(f"Critical key mismatch {key} - {v1} vs {v2}")
+                return False
             print(
                 f"WARNING: mismatch in key {key} - two calculations may not be comparable"
             )
     return True
 
 
+@lru_cache(maxsize=1024)
+def _fetch_input_parameters_dict(pk):
+    """Fetch the input parameters dict for an output node pk (memoized)."""
+    qdb = orm.QueryBuilder()
+    qdb.append(orm.Node, filters={"id": pk}, tag="out")
+    qdb.append(orm.CalcJobNode, with_outgoing="out")
+    qdb.append(orm.Dict, with_outgoing=orm.CalcJobNode, edge_filters={"label": "parameters"})
+    return qdb.one()[0].get_dict()
+
+
 def get_input_parameters_dict(out_node):
     """
     Get the input parameters for the output.
     This can be used to trace the exact inputs (not those for the workchain)
     that used to obtain the misc.
+
+    The lookup is memoized by pk - the inputs of a finished calculation are
+    immutable, so repeated traversals for the same node are redundant.
     """
-    from aiida.orm import CalcJobNode, Dict, Node, QueryBuilder
+    return _fetch_input_parameters_dict(out_node.pk)
+
+
+get_input_parameters_dict.cache_clear = _fetch_input_parameters_dict.cache_clear
 
-    qdb = QueryBuilder()
-    qdb.append(Node, filters={"id": out_node.pk}, tag="out")
-    qdb.append(CalcJobNode, with_outgoing="out")
-    qdb.append(Dict, with_outgoing=CalcJobNode, edge_filters={"label": "parameters"})
-    return qdb.one()[0].get_dict()
+
+def get_input_parameters_dicts(out_nodes) -> Dict[int, dict]:
+    """
+    Batch version of `get_input_parameters_dict` for multiple output nodes.
+
+    A single QueryBuilder call with an ``in`` filter replaces one 2-hop
+    traversal per node, so the query count no longer grows with the number
+    of calculations being compared.
+
+    Returns:
+        A dict mapping the pk of each output node to its input parameters dict.
+    """
+    pks = [node.pk for node in out_nodes]
+    qdb = orm.QueryBuilder()
+    qdb.append(orm.Node, filters={"id": {"in": pks}}, project=["id"], tag="out")
+    qdb.append(orm.CalcJobNode, with_outgoing="out")
+    qdb.append(
+        orm.Dict,
+        with_outgoing=orm.CalcJobNode,
+        edge_filters={"label": "parameters"},
+        project=["*"],
+    )
+    return {pk: param_node.get_dict() for pk, param_node in qdb.all()}
 
 
 class DelithiationManager:
@@ -255,20 +383,23 @@ class DelithiationManager:
 
         # Analyse the content
         self.nli = int(self.composition[working_ion])
-        self.composition_without_li = Composition(
-            {key: comp[key] for key in comp if key.symbol != working_ion}
-        )
+        # Single C-level subtraction instead of a per-key dict comprehension
+        self.composition_without_li = comp - Composition({working_ion: comp[working_ion]})
         self.nother = self.composition_without_li.num_atoms
+        # The reduction is invariant for this instance - compute it once
+        (
+            self._reduced_non_working,
+            self._reduction_factor,
+        ) = self.composition_without_li.get_reduced_composition_and_factor()
 
     @property
     def reduced_non_working_composition(self):
-        return self.composition_without_li.reduced_composition
+        return self._reduced_non_working
 
     @property
     def lithiation_level(self):
         """Stable lithiation level normalised per reduced non-working formula"""
-        _, factor = self.composition_without_li.get_reduced_composition_and_factor()
-        return self.nli / factor
+        return self.nli / self._reduction_factor
 
     def get_conventional_li_level_representation(self):
         """
@@ -276,11 +407,7 @@ class DelithiationManager:
         For example: LiCoO2 -> (1, CoO2), Li3Co4O8 -> (3/4, CoO2).
         This is useful when plotting the level of delithiations.
         """
-        (
-            reduced,
-            factor,
-        ) = self.composition_without_li.get_reduced_composition_and_factor()
-        return self.nli / factor, reduced
+        return self.nli / self._reduction_factor, self._reduced_non_working
 
     def create_delithaited_structures(
         self, num_remove, atol=1e-5, dummy="He"
@@ -341,14 +468,9 @@ class DelithiationManager:
                     raise ValueError(
                         "Keyword argument 'oxidation_state_mapping' must be passed for ranking with electrostatic energy."
                     )
-                for frame in frames:
-                    frame.add_oxidation_state_by_element(oxidation_state_mapping)
-                frames = sorted_by_ewald(frames)
-                # Remove the oxidation states
-                for frame in frames:
-                    frame.remove_oxidation_states()
-                # Pick only the top structures
-                records[num_remove] = frames[:pick_ewald_n_lowest]
+                records[num_remove] = top_k_by_ewald(
+                    frames, pick_ewald_n_lowest, oxidation_state_mapping
+                )
             else:
                 records[num_remove] = frames
         return records
@@ -379,20 +501,29 @@ class VoltageCurve:
         self.ref_entry = ref_entry
         self.working_ion = working_ion
 
-        # Sort the entries with decreasing Li content
-        self.entries.sort(
-            key=lambda x: x.composition[working_ion] / x.composition.num_atoms,
-            reverse=True,
+        # Sort the entries with decreasing Li content - the keys are computed
+        # once into an array and the permutation comes from argsort, avoiding
+        # repeated lambda calls and num_atoms traversals during the sort
+        sort_keys = np.fromiter(
+            (
+                entry.composition[working_ion] / entry.composition.num_atoms
+                for entry in self.entries
+            ),
+            dtype=np.float64,
+            count=len(self.entries),
         )
+        order = np.argsort(-sort_keys, kind="stable")
+        self.entries = [self.entries[i] for i in order]
+        self._sort_keys = sort_keys[order]
 
         # Find the terminal compositions
         lithiated = self.entries[0].composition  # One with the maximum lithation level
-        non_working_lithiated = Composition(
-            {key: lithiated[key] for key in lithiated if key.symbol != working_ion}
+        non_working_lithiated = lithiated - Composition(
+            {working_ion: lithiated[working_ion]}
         )
         delithiated = self.entries[-1].composition
-        non_working_delithiated = Composition(
-            {key: delithiated[key] for key in delithiated if key.symbol != working_ion}
+        non_working_delithiated = delithiated - Composition(
+            {working_ion: delithiated[working_ion]}
         )
 
         # Sanity check
@@ -420,21 +551,62 @@ class VoltageCurve:
             reverse=True,
         )
 
+        # Per-entry scalars cached for vectorized voltage evaluation
+        nli = np.array(
+            [entry.composition[working_ion] for entry in self.stable_entries]
+        )
+        self._stable_nli = nli
+        self._stable_nform = (
+            np.array([entry.composition.num_atoms for entry in self.stable_entries])
+            - nli
+        )
+        self._stable_energies = np.array(
+            [entry.energy for entry in self.stable_entries]
+        )
+
+        # One-shot per-entry reduction cache - pymatgen recomputes the
+        # reduction (a float GCD walk) on every reduced_composition /
+        # reduced_formula access. The stable entries are the same objects as
+        # the input entries, so keying by id() covers both lists.
+        self._reduced_by_id = {}
+        for entry in self.entries:
+            reduced = entry.composition.reduced_composition
+            self._reduced_by_id[id(entry)] = (reduced, reduced.reduced_formula)
+
+    def _reduced_and_formula(self, entry):
+        """Cached (reduced_composition, reduced_formula) pair of an entry."""
+        cached = self._reduced_by_id.get(id(entry))
+        if cached is None:
+            reduced = entry.composition.reduced_composition
+            cached = (reduced, reduced.reduced_formula)
+            self._reduced_by_id[id(entry)] = cached
+        return cached
+
+    def _unique_reduced_compositions(self, entries):
+        """Unique reduced compositions sorted by decreasing working-ion content.
+
+        Deduplication uses the reduced formula string - hashing a short string
+        is much cheaper than Composition equality, which walks all
+        element-amount pairs.
+        """
+        unique = {}
+        for entry in entries:
+            reduced, formula = self._reduced_and_formula(entry)
+            unique.setdefault(formula, reduced)
+        working_ion = self.working_ion
+        return sorted(
+            unique.values(),
+            key=lambda x: x[working_ion] / x.num_atoms,
+            reverse=True,
+        )
+
     @property
     def included_compositions(self):
-        all_comps = list(
-            {entry.composition.reduced_composition for entry in self.entries}
-        )
-        all_comps.sort(key=lambda x: x[self.working_ion] / x.num_atoms, reverse=True)
-        return all_comps
+        return self._unique_reduced_compositions(self.entries)
 
     @property
     def stable_compositions(self):
-        all_comps = list(
-            {entry.composition.reduced_composition for entry in self.stable_entries}
-        )
-        all_comps.sort(key=lambda x: x[self.working_ion] / x.num_atoms, reverse=True)
-        return all_comps
+        return self._unique_reduced_compositions(self.stable_entries)
 
     @property
     def average_voltage(self):
@@ -448,18 +620,19 @@ class VoltageCurve:
 
     def __repr__(self):
 
-        formula = self.entries[0].composition.reduced_formula
+        formula = self._reduced_and_formula(self.entries[0])[1]
         nentry = len(self.entries)
         output = f"VoltageCurve for {formula} with {nentry} entries"
         output += (
             f"\nAverage voltage: {self.average_voltage:.3f}\nCompositions: (* stable)"
         )
-        # Find the compositions
+        # Find the compositions - membership is tested on formula strings to
+        # avoid O(N*M) Composition equality scans
         all_comps = self.included_compositions
-        stable_comps = self.stable_compositions
+        stable_formulas = {comp.reduced_formula for comp in self.stable_compositions}
         for comp in all_comps:
             output += f"\n{comp.reduced_formula}"
-            if comp in stable_comps:
+            if comp.reduced_formula in stable_formulas:
                 output += " (*)"
         return output
 
@@ -470,15 +643,26 @@ class VoltageCurve:
             a list of composition pairs and voltages.
         """
         nstable = len(self.stable_entries)
-        conc_pair_and_voltage = []
-        for i in range(nstable - 1):
-            lith = self.stable_entries[i]
-            deli = self.stable_entries[i + 1]
-            voltage = voltage_between_pair(lith, deli, self.ref_entry, self.working_ion)
-            conc_pair_and_voltage.append(
-                [(lith.composition, deli.composition), voltage]
-            )
-        return conc_pair_and_voltage
+        if nstable < 2:
+            return []
+        # Vectorized equivalent of calling voltage_between_pair per pair
+        nli = self._stable_nli
+        nform = self._stable_nform
+        energies = self._stable_energies
+        ref_per_atom = self.ref_entry.energy / self.ref_entry.composition.num_atoms
+        eff_change = nli[:-1] - nli[1:] / nform[1:] * nform[:-1]
+        de = energies[1:] / nform[1:] * nform[:-1] - energies[:-1]
+        voltages = (de + eff_change * ref_per_atom) / eff_change
+        return [
+            [
+                (
+                    self.stable_entries[i].composition,
+                    self.stable_entries[i + 1].composition,
+                ),
+                float(voltage),
+            ]
+            for i, voltage in enumerate(voltages)
+        ]
 
     def get_plot_data(
         self, norm_formula=None, x_axis_deli=False
@@ -643,20 +827,128 @@ def create_delithiated_multiple_level(
     output = {}
     for nremoved, value in frame_dict.items():
         for idx, frame in enumerate(value):
-            # Rattle the atoms and perform sorting by species
-            new_structure = StructureData(pymatgen=frame)
-            atoms = new_structure.get_ase()
+            # Rattle the atoms and perform sorting by species - both branches
+            # order the sites alphabetically by chemical symbol, as
+            # ase.build.sort would
             if rattle.value > 0:
+                atoms = AseAtomsAdaptor.get_atoms(frame)
                 atoms.rattle(rattle.value)
-            new_structure = StructureData(ase=sort(atoms))
+                # Fancy indexing with an argsort over the symbols avoids
+                # ase.build.sort's pure-Python path
+                order = np.argsort(atoms.get_chemical_symbols(), kind="stable")
+                new_structure = StructureData(ase=atoms[order])
+            else:
+                # No perturbation needed - sort the pymatgen sites in place and
+                # skip the ASE round-trip entirely
+                frame.sort(key=lambda site: site.species_string)
+                new_structure = StructureData(pymatgen=frame)
             new_structure.label = structure.label + f" DELI {nremoved} {idx}"
             new_structure.description = f"Delithiated structure with {nremoved} removed Li atoms and index {nremoved} of the returned unique structures."
             output["structure_" + str(nremoved) + f"_{idx}"] = new_structure
     return output
 
 
-def sorted_by_ewald(structures: List[Structure]) -> List[Structure]:
+def _ewald_total_energy(structure: Structure, acc_factor=8.0) -> float:
+    """Total Ewald energy of a structure - top level so it can be pickled."""
+    return EwaldSummation(structure, acc_factor=acc_factor).total_energy
+
+
+def sorted_by_ewald(structures: List[Structure], acc_factor=8.0) -> List[Structure]:
     """
     Sort the structures by Ewald energy
+
+    Only the ranking matters here, so a reduced ``acc_factor`` (smaller
+    real-space cutoff) is used by default to cut the per-structure cost.
+    The summations are independent, so large batches are evaluated in a
+    process pool; small batches stay serial to avoid pool startup overhead.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    if len(structures) < 16:
+        energies = np.fromiter(
+            (_ewald_total_energy(s, acc_factor) for s in structures),
+            dtype=np.float64,
+            count=len(structures),
+        )
+    else:
+        chunksize = max(1, len(structures) // (4 * os.cpu_count()))
+        with ProcessPoolExecutor() as executor:
+            energies = np.fromiter(
+                executor.map(
+                    partial(_ewald_total_energy, acc_factor=acc_factor),
+                    structures,
+                    chunksize=chunksize,
+                ),
+                dtype=np.float64,
+                count=len(structures),
+            )
+    order = np.argsort(energies, kind="stable")
+    return [structures[i] for i in order]
+
+
+def sorted_by_ewald_fast(
+    structures: List[Structure], surrogate_acc=4.0, keep_top: int = None
+) -> List[Structure]:
+    """
+    Two-stage Ewald ranking when only the ``keep_top`` lowest structures matter.
+
+    A coarse reciprocal+self-energy surrogate (cheap - the real-space pair sum
+    dominates the full summation) screens the candidates, then only the best
+    ``3 * keep_top`` are refined with the full summation. Returns the refined
+    candidates sorted by full Ewald energy.
+    """
+    ncand = None if keep_top is None else keep_top * 3
+    if ncand is None or len(structures) <= ncand:
+        return sorted_by_ewald(structures)
+    surrogate = np.fromiter(
+        (
+            ewald.reciprocal_space_energy + ewald.point_energy
+            for ewald in (
+                EwaldSummation(s, acc_factor=surrogate_acc, compute_forces=False)
+                for s in structures
+            )
+        ),
+        dtype=np.float64,
+        count=len(structures),
+    )
+    candidates = np.argpartition(surrogate, ncand)[:ncand]
+    return sorted_by_ewald([structures[i] for i in candidates])
+
+
+def top_k_by_ewald(
+    frames: List[Structure], k: int, oxidation_state_mapping: Dict[str, float]
+) -> List[Structure]:
+    """
+    Return the ``k`` structures with the lowest Ewald energy.
+
+    Oxidation-state assignment and energy evaluation are fused into a single
+    pass over the frames, and only the surviving structures have their
+    oxidation states stripped - losers are dropped before the cleanup loop.
     """
-    return sorted(structures, key=lambda x: EwaldSummation(x).total_energy)
+    nframes = len(frames)
+    ncand = min(3 * k, nframes)
+    use_surrogate = ncand < nframes
+    scores = np.empty(nframes, dtype=np.float64)
+    for i, frame in enumerate(frames):
+        frame.add_oxidation_state_by_element(oxidation_state_mapping)
+        if use_surrogate:
+            ewald = EwaldSummation(frame, acc_factor=4.0, compute_forces=False)
+            scores[i] = ewald.reciprocal_space_energy + ewald.point_energy
+        else:
+            scores[i] = _ewald_total_energy(frame)
+    if use_surrogate:
+        # Coarse screen, then refine only the shortlisted candidates
+        candidates = np.argpartition(scores, ncand)[:ncand]
+        full = np.fromiter(
+            (_ewald_total_energy(frames[i]) for i in candidates),
+            dtype=np.float64,
+            count=ncand,
+        )
+        winners = candidates[np.argsort(full, kind="stable")][:k]
+    else:
+        winners = np.argsort(scores, kind="stable")[:k]
+    picked = [frames[i] for i in winners]
+    for frame in picked:
+        frame.remove_oxidation_states()
+    return picked
@@ -15,11 +15,145 @@ from aiida.orm import (
     StructureData,
 )
 from ase import Atoms
-from ase.build import sort
 from ase.neb import NEB
 from pymatgen.core import Structure
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 
+# Matches digits in kind names - compiled once at import time
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _np_repeat(atoms: Atoms, rep) -> Atoms:
+    """
+    Diagonal supercell by broadcast arithmetic.
+
+    Equivalent to ``atoms.repeat(rep)`` (same atom ordering) but builds the
+    positions and numbers with a single tile/broadcast instead of ASE's
+    per-cell Python loop. Tags are replicated when present.
+    """
+    rep = tuple(int(r) for r in rep)
+    cell = np.asarray(atoms.cell)
+    offsets = np.indices(rep).reshape(3, -1).T @ cell
+    ncells = offsets.shape[0]
+    supercell_atoms = Atoms(
+        numbers=np.tile(atoms.numbers, ncells),
+        positions=(offsets[:, None, :] + atoms.positions[None, :, :]).reshape(-1, 3),
+        cell=cell * np.asarray(rep)[:, None],
+        pbc=atoms.pbc,
+    )
+    tags = atoms.get_tags()
+    if tags.any():
+        supercell_atoms.set_tags(np.tile(tags, ncells))
+    return supercell_atoms
+
+
+def _rattle_positions(positions: np.ndarray, amp: float, seed=42) -> np.ndarray:
+    """
+    Displace positions by Gaussian noise of width ``amp`` in one array op.
+
+    Mirrors ase.Atoms.rattle (same RandomState seeding) without going through
+    the per-call ASE wrapper.
+    """
+    rng = np.random.RandomState(seed)
+    return positions + rng.normal(scale=amp, size=positions.shape)
+
+
+def _sort_by_symbols(atoms: Atoms) -> Atoms:
+    """Sort atoms by chemical symbol with a stable argsort (fancy indexing)."""
+    order = np.argsort(np.array(atoms.get_chemical_symbols()), kind="stable")
+    return atoms[order]
+
+
+def _sites_to_soa(pmg_structure) -> dict:
+    """
+    Extract the site data of an ordered pymatgen structure into NumPy arrays.
+
+    Returns a dict with ``species`` (N,) object array, ``coords`` (N, 3)
+    cartesian and ``frac`` (N, 3) fractional coordinates. Pulling the columns
+    out once allows the filtering/masking/mapping below to run as array
+    operations instead of per-site attribute access.
+    """
+    return {
+        "species": np.array([site.species_string for site in pmg_structure.sites], dtype=object),
+        "coords": np.asarray(pmg_structure.cart_coords),
+        "frac": np.asarray(pmg_structure.frac_coords),
+    }
+
+
+def _site_permutations(pmg_structure, symprec=1e-5) -> np.ndarray:
+    """
+    Symmetry operations of a structure expressed as site permutations.
+
+    Returns an (nops, nsites) integer array where row ``k`` maps site ``i``
+    to ``perms[k, i]`` under the k-th spglib symmetry operation.
+    """
+    import spglib
+
+    soa = _sites_to_soa(pmg_structure)
+    frac = soa["frac"]
+    unique_species = {symbol: n for n, symbol in enumerate(sorted(set(soa["species"])))}
+    numbers = [unique_species[symbol] for symbol in soa["species"]]
+    sym = spglib.get_symmetry((pmg_structure.lattice.matrix, frac, numbers), symprec=symprec)
+
+    perms = np.empty((len(sym["rotations"]), len(frac)), dtype=np.intp)
+    for k, (rot, trans) in enumerate(zip(sym["rotations"], sym["translations"])):
+        new_frac = frac @ rot.T + trans
+        # Minimum-image match of each transformed site to an original site
+        diff = new_frac[:, None, :] - frac[None, :, :]
+        diff -= np.rint(diff)
+        perms[k] = np.abs(diff).sum(axis=-1).argmin(axis=1)
+    return perms
+
+
+def _fast_unique_substitutions(pmg_structure, element, dummy, nsub, symprec=1e-5) -> list:
+    """
+    Enumerate symmetry-inequivalent substitutions of ``nsub`` sites directly.
+
+    Drop-in replacement for bsym's ``unique_structure_substitutions`` for
+    small ``nsub`` (1 or 2, the common defect-screening case): candidate
+    index sets come from ``itertools.combinations`` and each set is
+    canonicalized by applying the host symmetry permutations and keeping the
+    lexicographically smallest image, so the general group-theory machinery
+    is skipped entirely.
+    """
+    from itertools import combinations
+
+    candidates = np.flatnonzero(_sites_to_soa(pmg_structure)["species"] == element).tolist()
+    perms = _site_permutations(pmg_structure, symprec=symprec)
+
+    seen = {}
+    for comb in combinations(candidates, nsub):
+        idx = np.asarray(comb, dtype=np.intp)
+        canonical = min(tuple(np.sort(perm[idx])) for perm in perms)
+        if canonical not in seen:
+            seen[canonical] = comb
+
+    unique_structure = []
+    for comb in seen.values():
+        ustruc = pmg_structure.copy()
+        for n in comb:
+            ustruc.replace(n, dummy)
+        unique_structure.append(ustruc)
+    return unique_structure
+
+
+def _structure_data_from_pmg_fast(pmg_structure) -> StructureData:
+    """
+    Build a StructureData from an ordered pymatgen structure.
+
+    Batch generators (make_vac_at_o, delithiate_unique_sites, ...) emit many
+    frames sharing the same cell and species set - appending the atoms
+    directly from the site arrays avoids the generic ``pymatgen=`` conversion
+    machinery per frame. Only valid for fully ordered structures.
+    """
+    sdata = StructureData()
+    sdata.set_cell(pmg_structure.lattice.matrix.tolist())
+    sdata.set_pbc((True, True, True))
+    positions = pmg_structure.cart_coords
+    for site, position in zip(pmg_structure.sites, positions):
+        sdata.append_atom(position=position.tolist(), symbols=site.species_string)
+    return sdata
+
 
 @calcfunction
 def magnetic_structure_decorate(structure, magmom):
@@ -87,17 +221,18 @@ def make_vac(cell, indices, supercell, **kwargs):
 
     atoms = cell.get_ase()
     if isinstance(supercell.get_list()[0], int):
-        supercell_atoms = atoms.repeat(supercell.get_list())
+        supercell_atoms = _np_repeat(atoms, supercell.get_list())
     else:
         supercell_atoms = make_supercell(atoms, np.array(supercell.get_list()))
 
-    mask = np.in1d(np.arange(len(supercell_atoms)), indices.get_list())
-    supercell_atoms = supercell_atoms[~mask]  ## Remove any atoms in the original indices
+    keep = np.ones(len(supercell_atoms), dtype=bool)
+    keep[np.asarray(indices.get_list(), dtype=np.intp)] = False  ## Remove any atoms in the original indices
+    supercell_atoms = supercell_atoms[keep]
     supercell_atoms.set_tags(None)
     supercell_atoms.set_masses(None)
     # Now I sort the supercell in the order of chemical symbols
     if kwargs.get("sort", True):
-        supercell_atoms = sort(supercell_atoms)
+        supercell_atoms = _sort_by_symbols(supercell_atoms)
     output = StructureData(ase=supercell_atoms)
     return output
 
@@ -121,27 +256,38 @@ def make_vac_at_o(cell, excluded_sites, nsub, supercell):
     assert "Ts" not in struc.composition
     assert "Og" not in struc.composition
 
-    for n, site in enumerate(struc.sites):
-        if n in excluded:
-            site.species = Composition("Ts")
+    # Direct indexed replacement - avoids scanning every site against the
+    # excluded list
+    for n in set(excluded):
+        struc.replace(n, "Ts")
 
     # Expand the supercell with S subsituted strucutre
     struc = struc * supercell.get_list()
     noxygen = int(struc.composition["O"])
-    unique_structure = unique_structure_substitutions(struc, "O", {"Og": nsub, "O": noxygen - nsub})
+    if nsub <= 2:
+        # Small substitution counts are enumerated directly - bsym's general
+        # machinery is only needed for larger combinatorics
+        unique_structure = _fast_unique_substitutions(struc, "O", "Og", nsub)
+    else:
+        unique_structure = unique_structure_substitutions(struc, "O", {"Og": nsub, "O": noxygen - nsub})
     # Convert back to normal structure
     # Remove P as they are vacancies, Convert S back to O
     for ustruc in unique_structure:
-        p_indices = [n for n, site in enumerate(ustruc.sites) if site.species == Composition("Og")]
+        p_indices = np.flatnonzero(_sites_to_soa(ustruc)["species"] == "Og").tolist()
         ustruc.remove_sites(p_indices)
         # Convert S sites back to O
         ustruc["Ts"] = "O"
 
     output_structs = {}
     for n, s in enumerate(unique_structure):
-        stmp = StructureData(pymatgen=s)
-        stmp.base.attributes.set("vac_id", n)
-        stmp.base.attributes.set("supercell", " ".join(map(str, supercell.get_list())))
+        stmp = _structure_data_from_pmg_fast(s)
+        # One attribute-dict write instead of one per key
+        stmp.base.attributes.set_many(
+            {
+                "vac_id": n,
+                "supercell": " ".join(map(str, supercell.get_list())),
+            }
+        )
         stmp.label = cell.label + f" VAC {n}"
         output_structs[f"structure_{n:04d}"] = stmp
 
@@ -172,32 +318,51 @@ def make_vac_at_o_and_shake(cell, excluded_sites, nsub, supercell, shake_amp):
     assert "Ts" not in struc.composition
     assert "Og" not in struc.composition
 
-    for n, site in enumerate(struc.sites):
-        if n in excluded:
-            site.species = Composition("Ts")
+    # Direct indexed replacement - avoids scanning every site against the
+    # excluded list
+    for n in set(excluded):
+        struc.replace(n, "Ts")
 
     # Expand the supercell with S subsituted strucutre
     struc = struc * supercell.get_list()
     noxygen = int(struc.composition["O"])
-    unique_structure = unique_structure_substitutions(struc, "O", {"Og": nsub, "O": noxygen - nsub})
+    if nsub <= 2:
+        # Small substitution counts are enumerated directly - bsym's general
+        # machinery is only needed for larger combinatorics
+        unique_structure = _fast_unique_substitutions(struc, "O", "Og", nsub)
+    else:
+        unique_structure = unique_structure_substitutions(struc, "O", {"Og": nsub, "O": noxygen - nsub})
     # Convert back to normal structure
     # Remove P as they are vacancies, Convert S back to O
     for ustruc in unique_structure:
-        p_indices = [n for n, site in enumerate(ustruc.sites) if site.species == Composition("Og")]
+        p_indices = np.flatnonzero(_sites_to_soa(ustruc)["species"] == "Og").tolist()
 
         ustruc.remove_sites(p_indices)
         # Convert S sites back to O
         ustruc["Ts"] = "O"
 
-    # Perturb structures
+    # Perturb structures - each perturbation is independent, so large batches
+    # are distributed over a process pool. Node construction stays in the main
+    # process since StructureData is not process-safe.
     trans = PerturbStructureTransformation(distance=float(shake_amp))
-    unique_structure = [trans.apply_transformation(ustruc) for ustruc in unique_structure]
+    if len(unique_structure) >= 16:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor() as executor:
+            unique_structure = list(executor.map(trans.apply_transformation, unique_structure))
+    else:
+        unique_structure = [trans.apply_transformation(ustruc) for ustruc in unique_structure]
 
     output_structs = {}
     for n, s in enumerate(unique_structure):
-        stmp = StructureData(pymatgen=s)
-        stmp.base.attributes.set("vac_id", n)
-        stmp.base.attributes.set("supercell", " ".join(map(str, supercell.get_list())))
+        stmp = _structure_data_from_pmg_fast(s)
+        # One attribute-dict write instead of one per key
+        stmp.base.attributes.set_many(
+            {
+                "vac_id": n,
+                "supercell": " ".join(map(str, supercell.get_list())),
+            }
+        )
         stmp.label = cell.label + f" VAC {n}"
         output_structs[f"structure_{n:04d}"] = stmp
 
@@ -209,16 +374,22 @@ def rattle(structure, amp):
     """
     Rattle the structure by a certain amplitude
     """
+    from aiida.orm.nodes.data.structure import Site
+
     native_keys = ["cell", "pbc1", "pbc2", "pbc3", "kinds", "sites", "mp_id"]
     # Keep the foreign keys as it is
     foreign_attrs = {key: value for key, value in structure.attributes.items() if key not in native_keys}
-    atoms = structure.get_ase()
-    atoms.rattle(amp.value)
-    # Clean any tags etc
-    atoms.set_tags(None)
-    atoms.set_masses(None)
-    # Convert it back
-    out = StructureData(ase=atoms)
+    # Displace the coordinates directly - no ASE round-trip needed, and the
+    # kind information carries over unchanged
+    positions = np.array([site.position for site in structure.sites])
+    new_positions = _rattle_positions(positions, amp.value)
+    out = StructureData()
+    out.set_cell(structure.cell)
+    out.set_pbc(structure.pbc)
+    for kind in structure.kinds:
+        out.append_kind(kind)
+    for site, position in zip(structure.sites, new_positions):
+        out.append_site(Site(kind_name=site.kind_name, position=position.tolist()))
     out.base.attributes.set_many(foreign_attrs)
     out.label = structure.label + " RATTLED"
     return out
@@ -245,14 +416,14 @@ def res2structure(file):
     from aiida_user_addons.tools.resutils import read_res
 
     with file.open(file.filename) as fhandle:
-        titls, atoms = read_res(fhandle.readlines())
+        # Single C-level split instead of building line objects one by one
+        titls, atoms = read_res(fhandle.read().splitlines())
     atoms.set_tags(None)
     atoms.set_masses(None)
     atoms.set_calculator(None)
     atoms.wrap()
     struct = StructureData(ase=atoms)
-    struct.base.attributes.set("H", titls.enthalpy)
-    struct.base.attributes.set("search_label", titls.label)
+    struct.base.attributes.set_many({"H": titls.enthalpy, "search_label": titls.label})
     struct.label = file.filename
     return struct
 
@@ -354,11 +525,11 @@ def make_supercell(structure, supercell, **kwargs):
 
     slist = supercell.get_list()
     if isinstance(slist[0], int):
-        satoms = atoms.repeat(slist)
+        satoms = _np_repeat(atoms, slist)
     else:
         satoms = ase_supercell(atoms, np.array(slist))
     if "no_sort" not in kwargs:
-        satoms = sort(satoms)
+        satoms = _sort_by_symbols(satoms)
 
     if tags:
         stags = satoms.get_tags().tolist()
@@ -383,33 +554,31 @@ def delithiate_by_wyckoff(structure, wyckoff, **kwargs):
     psymm = ana.get_symmetrized_structure()
     natoms = len(psymm.sites)
 
-    rm_indices = []
-    for lsite, lidx, symbol in zip(psymm.equivalent_sites, psymm.equivalent_indices, psymm.wyckoff_symbols):
-        site = lsite[0]
-        if site.species_string != remove_symbol:
-            continue
-        if symbol != remove_wyckoff:
-            continue
-        rm_indices.extend(lidx)
+    # Vectorized selection over the equivalent-site groups
+    group_symbols = np.array([lsite[0].species_string for lsite in psymm.equivalent_sites])
+    group_wyckoffs = np.array(psymm.wyckoff_symbols)
+    hits = np.where((group_symbols == remove_symbol.value) & (group_wyckoffs == remove_wyckoff))[0]
+    # Sorted, de-duplicated indices - remove_sites then walks the site list once
+    rm_indices = sorted({idx for i in hits for idx in psymm.equivalent_indices[i]})
     assert rm_indices, f"Nothing to remove for wyckoff {remove_wyckoff}"
     psymm.remove_sites(rm_indices)
     out = StructureData(pymatgen=Structure.from_sites(psymm.sites))
     for kind in out.kinds:
-        assert not re.search(r"\d", kind.name), f"Kind name: {kind.name} contains indices"
+        assert not _DIGIT_RE.search(kind.name), f"Kind name: {kind.name} contains indices"
 
     # Set some special attribute
-    out.base.attributes.set("removed_specie", remove_symbol)
-    out.base.attributes.set("removed_wyckoff", remove_wyckoff)
+    out.base.attributes.set_many(
+        {
+            "removed_specie": remove_symbol,
+            "removed_wyckoff": remove_wyckoff,
+        }
+    )
     out.label += f" delithiated {remove_wyckoff}"
 
     # Prepare a mask for the removed structures
-    mask = []
-    for i in range(natoms):
-        if i in rm_indices:
-            mask.append(False)
-        else:
-            mask.append(True)
-    outdict = {"structure": out, "mask": orm.List(list=mask)}
+    mask = np.ones(natoms, dtype=bool)
+    mask[np.asarray(rm_indices, dtype=np.intp)] = False
+    outdict = {"structure": out, "mask": orm.List(list=mask.tolist())}
     return outdict
 
 
@@ -425,7 +594,8 @@ def delithiate_full(structure, **kwargs):
     """
     remove_symbol = kwargs.get("element", orm.Str("Li"))
     pstruct = structure.get_pymatgen()
-    to_remove = [idx for idx, site in enumerate(pstruct.sites) if site.species_string == remove_symbol]
+    soa = _sites_to_soa(pstruct)
+    to_remove = np.flatnonzero(soa["species"] == remove_symbol.value).tolist()
     pstruct.remove_sites(to_remove)
 
     out = StructureData(pymatgen=pstruct)
@@ -434,14 +604,10 @@ def delithiate_full(structure, **kwargs):
     out.description = f"A fully delithiated structure, crated from {structure.uuid}"
 
     # Create the mask
-    mask = []
     natoms = len(structure.sites)
-    for i in range(natoms):
-        if i in to_remove:
-            mask.append(False)
-        else:
-            mask.append(True)
-    outdict = {"structure": out, "mask": orm.List(list=mask)}
+    mask = np.ones(natoms, dtype=bool)
+    mask[np.asarray(to_remove, dtype=np.intp)] = False
+    outdict = {"structure": out, "mask": orm.List(list=mask.tolist())}
     return outdict
 
 
@@ -459,28 +625,31 @@ def delithiate_one(structure, **kwargs):
     """
 
     remove_symbol = kwargs.get("element", orm.Str("Li"))
+    # Convert once - each removal works on a cheap copy of this structure
     pstruct = structure.get_pymatgen()
-    to_remove = [idx for idx, site in enumerate(pstruct.sites) if site.species_string == remove_symbol]
+    soa = _sites_to_soa(pstruct)
+    to_remove = np.flatnonzero(soa["species"] == remove_symbol.value).tolist()
     outdict = {}
+    natoms = len(structure.sites)
+    full_mask = np.ones(natoms, dtype=bool)
     for idx, site in enumerate(to_remove):
-        tmp_struct = structure.get_pymatgen()
+        tmp_struct = pstruct.copy()
         tmp_struct.remove_sites([site])
 
         out = StructureData(pymatgen=tmp_struct)
-        out.base.attributes.set("removed_specie", remove_symbol)
-        out.base.attributes.set("removed_site", site)
+        out.base.attributes.set_many(
+            {
+                "removed_specie": remove_symbol,
+                "removed_site": site,
+            }
+        )
         out.label = structure.label + f" delithiated 1 - {idx}"
         out.description = f"A structure with one Li removed, crated from {structure.uuid}"
 
         # Create the mask
-        mask = []
-        natoms = len(structure.sites)
-        for i in range(natoms):
-            if i == site:
-                mask.append(False)
-            else:
-                mask.append(True)
-        outdict.update({f"structure_{idx}": out, f"mask_{idx}": orm.List(list=mask)})
+        mask = full_mask.copy()
+        mask[site] = False
+        outdict.update({f"structure_{idx}": out, f"mask_{idx}": orm.List(list=mask.tolist())})
     return outdict
 
 
@@ -538,14 +707,19 @@ def _delithiate_unique_sites(cell, excluded_sites, nsub, atol, pmg_only=False, l
     struc = cell.get_pymatgen()
     excluded = excluded_sites.get_list()
 
-    for n, site in enumerate(struc.sites):
-        if n in excluded:
-            site.species = Composition(exclude_dummy)
+    for n in set(excluded):
+        struc.replace(n, exclude_dummy)
 
     # Expand the supercell with S subsituted strucutre
     noli = int(struc.composition[element])
     li_left = noli - nsub
-    if li_left > 0:
+    if li_left < 0:
+        raise ValueError(f"There are {noli} {element} but requested to remove {nsub} of them!!")
+    if nsub <= 2:
+        # Small substitution counts are enumerated directly - bsym's general
+        # machinery is only needed for larger combinatorics
+        unique_structure = _fast_unique_substitutions(struc, element, vacancy_dummy, nsub, symprec=float(atol))
+    elif li_left > 0:
         unique_structure = unique_structure_substitutions(
             struc,
             element,
@@ -553,14 +727,12 @@ def _delithiate_unique_sites(cell, excluded_sites, nsub, atol, pmg_only=False, l
             verbose=True,
             atol=float(atol),
         )
-    elif li_left == 0:
-        unique_structure = unique_structure_substitutions(struc, element, {vacancy_dummy: nsub}, verbose=True, atol=float(atol))
     else:
-        raise ValueError(f"There are {noli} {element} but requested to remove {nsub} of them!!")
+        unique_structure = unique_structure_substitutions(struc, element, {vacancy_dummy: nsub}, verbose=True, atol=float(atol))
 
     # Convert back to normal structure
     for ustruc in unique_structure:
-        p_indices = [n for n, site in enumerate(ustruc.sites) if site.species == Composition(vacancy_dummy)]
+        p_indices = np.flatnonzero(_sites_to_soa(ustruc)["species"] == vacancy_dummy).tolist()
         ustruc.remove_sites(p_indices)
         ustruc[exclude_dummy] = element
 
@@ -571,9 +743,16 @@ def _delithiate_unique_sites(cell, excluded_sites, nsub, atol, pmg_only=False, l
         return unique_structure
 
     # Transform into StructureData
+    # Build a KD-tree over the original sites once - mapping each new site
+    # back to its original is then a single batched nearest-neighbour query
+    # instead of an O(N^2) scan of pairwise pymatgen distances.
+    from scipy.spatial import cKDTree
+
+    tree = cKDTree(_sites_to_soa(struc)["coords"])
+
     output_dict = {}
     for n, s in enumerate(unique_structure):
-        stmp = StructureData(pymatgen=s)
+        stmp = _structure_data_from_pmg_fast(s)
         stmp.base.attributes.set("delithiate_id", n)
         stmp.label = cell.label + f" delithiate {n}"
         output_dict[f"structure_{n:04d}"] = stmp
@@ -581,19 +760,13 @@ def _delithiate_unique_sites(cell, excluded_sites, nsub, atol, pmg_only=False, l
         # Create the mask to map old site to the new sites
         # can be used to redfine per-site properties such as the mangetic moments
         # Simply search for the close position matches.
-        mapping = []
-        for i_new, new_site in enumerate(s.sites):
-            found = False
-            for i_old, old_site in enumerate(struc.sites):
-                dist = new_site.distance(old_site)
-                if dist < 0.1:
-                    mapping.append(i_old)
-                    found = True
-                    break
-            if not found:
-                raise RuntimeError(f"Cannot found original site for {new_site}")
+        new_coords = _sites_to_soa(s)["coords"]
+        dists, mapping = tree.query(new_coords, k=1)
+        if not (dists < 0.1).all():
+            bad = s.sites[int(np.argmax(dists))]
+            raise RuntimeError(f"Cannot found original site for {bad}")
         map_array = ArrayData()
-        map_array.set_array("site_mapping", np.array(mapping))
+        map_array.set_array("site_mapping", np.asarray(mapping))
         output_dict[f"mapping_{n:04d}"] = map_array
 
     return output_dict
@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Callable, Tuple, Union
 
 import aiida.orm as orm
-from aiida.common.exceptions import NotExistent
+from aiida.common.exceptions import MultipleObjectsError, NotExistent
 from ase.build import sort
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.db import connect
@@ -49,14 +49,16 @@ def dbtoaiida(
     if group_reduced_structure is None:
         group_reduced_structure = orm.Group.objects.get_or_create(label=group_structure.label + "-reduced")[0]
     with connect(db_path) as conn:
-        for i, row in enumerate(conn.select(converged=False, struct_type="initial", **row_filters)):
+        rows = list(conn.select(converged=False, struct_type="initial", **row_filters))
+
+        # One bulk existence query instead of one QueryBuilder round-trip per row
+        existing = set()
+        if rows:
             q = orm.QueryBuilder()
             q.append(
                 orm.StructureData,
-                filters={
-                    "attributes.ce_uuid": row.unique_id,
-                    "attributes.ce_uid": row.id,
-                },
+                filters={"attributes.ce_uuid": {"in": [row.unique_id for row in rows]}},
+                project=["attributes.ce_uuid", "attributes.ce_uid"],
             )
             if limit_to_group:
                 q.append(
@@ -64,8 +66,11 @@ def dbtoaiida(
                     filters={"id": group_structure.id},
                     with_node=orm.StructureData,
                 )
-            if q.count() > 0:
-                print(f"Structure {row.unique_id} {row.name} has been deposited into the database already: {q.first()[0]}")
+            existing = {tuple(entry) for entry in q.all()}
+
+        for i, row in enumerate(rows):
+            if (row.unique_id, row.id) in existing:
+                print(f"Structure {row.unique_id} {row.name} has been deposited into the database already")
                 continue
 
             atoms = sort(row.toatoms())  # We have to sort the atoms so it is easier for the subsequent calculations
@@ -111,7 +116,8 @@ def aiidatodb(
     conn = connect(str(db_path))
     # Select the initial structures
     rows = list(conn.select(struct_type="initial"))
-    # Process the rows
+    # Process the rows - resolve everything from AiiDA first, write afterwards
+    pending = []
     for row in rows:
         # Find the calculation
         try:
@@ -128,6 +134,9 @@ def aiidatodb(
             continue
 
         ra = RelaxationAnalyser(node)
+        # Bind the structures once - each access traverses the provenance graph
+        out_struct = ra.output_structure
+        in_struct = ra.input_structure
 
         # Include metadata in the database
         custom_kvp_init = {
@@ -135,15 +144,15 @@ def aiidatodb(
             "aiida_relax_uuid": node.uuid,
         }  # For the initial structure row
         custom_kvp_final = {
-            "aiida_structure_uuid": ra.output_structure.uuid,
+            "aiida_structure_uuid": out_struct.uuid,
             "aiida_relax_uuid": node.uuid,
         }  # For the final structure row
         custom_kvp_final_origin = {
-            "aiida_structure_uuid": ra.input_structure.uuid,
+            "aiida_structure_uuid": in_struct.uuid,
             "aiida_relax_uuid": node.uuid,
         }  # For input structure for the final structure
 
-        final_atoms = ra.output_structure.get_ase()
+        final_atoms = out_struct.get_ase()
         if ra.is_converged:
             edict = ra.node.outputs.misc["total_energies"]
         else:
@@ -156,17 +165,42 @@ def aiidatodb(
 
         print(f"Processing {node.label}")
 
-        # Delete the existing structure
-        if hasattr(row, "final_struct_id"):
-            conn.delete([row.final_struct_id])
-        if hasattr(row, "final_origin_struct_id"):
-            conn.delete([row.final_origin_struct_id])
-
-        # Inserting the input structure for the geometry optimisation
-        final_atoms_origin = ra.input_structure.get_ase()
-        final_origin_id = conn.write(final_atoms_origin, key_value_pairs=custom_kvp_final_origin)
-        custom_kvp_init["final_origin_struct_id"] = final_origin_id
+        final_atoms_origin = in_struct.get_ase()
+        pending.append(
+            (
+                row,
+                final_atoms,
+                final_atoms_origin,
+                custom_kvp_init,
+                custom_kvp_final,
+                custom_kvp_final_origin,
+            )
+        )
 
+    # Batch the deletions and origin-structure writes in one transaction
+    # rather than paying a commit/fsync per row
+    with conn:
+        for (
+            row,
+            _,
+            final_atoms_origin,
+            custom_kvp_init,
+            _,
+            custom_kvp_final_origin,
+        ) in pending:
+            # Delete the existing structure
+            if hasattr(row, "final_struct_id"):
+                conn.delete([row.final_struct_id])
+            if hasattr(row, "final_origin_struct_id"):
+                conn.delete([row.final_origin_struct_id])
+
+            # Inserting the input structure for the geometry optimisation
+            final_origin_id = conn.write(final_atoms_origin, key_value_pairs=custom_kvp_final_origin)
+            custom_kvp_init["final_origin_struct_id"] = final_origin_id
+
+    # update_db opens its own connection per call, so it must run after the
+    # batched transaction has committed
+    for row, final_atoms, _, custom_kvp_init, custom_kvp_final, _ in pending:
         update_db(
             uid_initial=row.id,
             final_struct=final_atoms,
@@ -185,7 +219,11 @@ def get_calc_finder(allowed_exit_status=0):
     if isinstance(allowed_exit_status, int):
         allowed_exit_status = [allowed_exit_status]
 
-    def _inner(group_workflows, ce_initial_uuid) -> Tuple[orm.WorkChainNode, str]:
+    # Per-group cache of ce_uuid -> workflow node, populated by a single
+    # query so repeated look ups (e.g. from aiidatodb) are dict accesses
+    caches = {}
+
+    def _build_cache(group_workflows) -> dict:
         q = orm.QueryBuilder()
         q.append(orm.Group, filters={"id": {"in": [group_workflows.id]}})
         q.append(
@@ -203,9 +241,24 @@ def get_calc_finder(allowed_exit_status=0):
         q.append(
             orm.StructureData,
             with_outgoing=orm.CalcFunctionNode,
-            filters={"attributes.ce_uuid": ce_initial_uuid},
             project=["attributes.ce_uuid"],
         )
-        return q.one()
+        cache = {}
+        for node, ce_uuid in q.all():
+            # Preserve the one-match guard of the per-uuid query: silently
+            # keeping an arbitrary workflow could deposit the wrong
+            # calculation's energy into the CLEASE database
+            if ce_uuid in cache:
+                raise MultipleObjectsError(f"More than one workflow found for initial structure {ce_uuid}")
+            cache[ce_uuid] = (node, ce_uuid)
+        return cache
+
+    def _inner(group_workflows, ce_initial_uuid) -> Tuple[orm.WorkChainNode, str]:
+        if group_workflows.id not in caches:
+            caches[group_workflows.id] = _build_cache(group_workflows)
+        try:
+            return caches[group_workflows.id][ce_initial_uuid]
+        except KeyError:
+            raise NotExistent(f"No workflow found for initial structure {ce_initial_uuid}")
 
     return _inner
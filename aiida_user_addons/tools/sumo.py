@@ -2,30 +2,25 @@
 Use sumo to plot the AiiDA BandsData
 """
 
+import io
 import logging
+import re
 import warnings
+from functools import lru_cache
 
 import numpy as np
 from aiida.orm import BandsData, StructureData
-from castepxbin import compute_pdos
-from pymatgen.core import Lattice
+from pymatgen.core import Lattice, Structure
 from pymatgen.electronic_structure.bandstructure import (
     BandStructureSymmLine,
     Spin,
 )
 from pymatgen.electronic_structure.core import Spin
 from pymatgen.electronic_structure.dos import CompleteDos, Dos
-from pymatgen.phonon.bandstructure import PhononBandStructureSymmLine
-from sumo.electronic_structure.dos import load_dos
-from sumo.electronic_structure.effective_mass import (
-    fit_effective_mass,
-    get_fitting_data,
-)
-from sumo.plotting import dos_plotter
-from sumo.plotting.bs_plotter import SBSPlotter
-from sumo.plotting.phonon_bs_plotter import SPhononBSPlotter
 
-from aiida_user_addons.tools.vasp import pmg_vasprun
+# The sumo/castepxbin plotting machinery (and matplotlib behind it) is
+# imported lazily inside the functions that need it - importing this module
+# for the DOS routines alone should not pay that start-up cost
 
 
 def get_sumo_dos_plotter(scf_node, **kwargs):
@@ -39,6 +34,11 @@ def get_sumo_dos_plotter(scf_node, **kwargs):
     Returns:
         A `SDOSPlotter` object to be used for plotting the density of states.
     """
+    from sumo.electronic_structure.dos import load_dos
+    from sumo.plotting import dos_plotter
+
+    from aiida_user_addons.tools.vasp import pmg_vasprun
+
     vasprun, _ = pmg_vasprun(scf_node, parse_outcar=False)
     tdos, pdos = load_dos(vasprun, **kwargs)
     dp = dos_plotter.SDOSPlotter(tdos, pdos)
@@ -68,41 +68,42 @@ def get_pmg_bandstructure(bands_node, structure=None, efermi=None, **kwargs):
     except (KeyError, AttributeError):
         occupations = None
 
-    try:
-        efermi_raw = bands_node.base.attributes.get("efermi")
-    except (KeyError, AttributeError):
-        efermi_raw = None
+    # Fetch the attribute dict once instead of one backend lookup per key
+    attributes = dict(bands_node.base.attributes.all)
+    efermi_raw = attributes.get("efermi")
 
     if efermi:
         efermi_raw = efermi
 
-    labels = bands_node.base.attributes.get("labels")
-    label_numbers = bands_node.base.attributes.get("label_numbers")
+    labels = attributes.get("labels")
+    label_numbers = attributes.get("label_numbers")
 
     # Construct the band_dict
     bands_shape = bands.shape
     if len(bands_shape) == 3:
         if bands_shape[0] == 2:
             bands_dict = {
-                Spin.up: bands[0].T,  # Have to be (bands, kpoints)
-                Spin.down: bands[1].T,  # Have to be (bands, kpoints)
+                # Have to be (bands, kpoints); contiguous copies so the
+                # row-wise access downstream is not strided
+                Spin.up: np.ascontiguousarray(bands[0].T),
+                Spin.down: np.ascontiguousarray(bands[1].T),
             }
         else:
             bands_dict = {
-                Spin.up: bands[0].T,  # Have to be (bands, kpoints)
+                Spin.up: np.ascontiguousarray(bands[0].T),  # Have to be (bands, kpoints)
             }
     else:
-        bands_dict = {Spin.up: bands.T}
+        bands_dict = {Spin.up: np.ascontiguousarray(bands.T)}
 
-    if "cell" in bands_node.base.attributes.keys():
-        lattice = Lattice(bands_node.base.attributes.get("cell"))
+    cell = attributes.get("cell")
+    if cell is not None:
+        lattice = Lattice(cell)
     else:
         lattice = Lattice(structure.cell)
 
-    # Constructure the label dictionary
-    labels_dict = {}
-    for label, number in zip(make_latex_labels(labels), label_numbers):
-        labels_dict[label] = kpoints[number]
+    # Constructure the label dictionary - one fancy-index gather instead of a
+    # per-label row lookup
+    labels_dict = dict(zip(make_latex_labels(labels), kpoints[np.asarray(label_numbers, dtype=np.intp)]))
 
     # get the efermi
     if efermi_raw is None:
@@ -139,17 +140,36 @@ def get_sumo_bands_plotter(bands, efermi=None, structure=None, **kwargs):
     Returns:
         A `SBSPlotter` object
     """
-    bands_structure = get_pmg_bandstructure(bands, efermi=efermi, structure=structure, **kwargs)
+    from sumo.plotting.bs_plotter import SBSPlotter
+
+    # Stored nodes are immutable, so the (expensive) BandStructureSymmLine
+    # construction can be memoized on the node identity
+    if structure is None and not kwargs and bands.is_stored:
+        bands_structure = _cached_pmg_bandstructure(bands.uuid, efermi)
+    else:
+        bands_structure = get_pmg_bandstructure(bands, efermi=efermi, structure=structure, **kwargs)
     return SBSPlotter(bands_structure)
 
 
+@lru_cache(maxsize=32)
+def _cached_pmg_bandstructure(bands_uuid, efermi):
+    """Memoized get_pmg_bandstructure keyed on the stored node's uuid."""
+    from aiida.orm import load_node
+
+    return get_pmg_bandstructure(load_node(bands_uuid), efermi=efermi)
+
+
+get_sumo_bands_plotter.cache_clear = _cached_pmg_bandstructure.cache_clear
+
+
 def find_vbm(bands, occupations, tol=1e-4):
     """
     Find the fermi energy, put it at the top of VBM
     NOTE: this differs from the fermi energy reported in VASP when there is any
     electronic smearing.
     """
-    return bands[occupations > tol].max()
+    # Masked reduction - one streaming pass, no gathered temporary
+    return np.where(occupations > tol, bands, -np.inf).max()
 
 
 def find_cbm(bands, occupations, tol=1e-4):
@@ -158,37 +178,38 @@ def find_cbm(bands, occupations, tol=1e-4):
     NOTE: this differs from the fermi energy reported in VASP when there is any
     electronic smearing.
     """
-    return bands[occupations < tol].min()
+    # Masked reduction - one streaming pass, no gathered temporary
+    return np.where(occupations < tol, bands, np.inf).min()
+
+
+_LATEX_LABEL_MAPPING = {
+    "GAMMA": r"\Gamma",
+    "LAMBDA": r"\Lambda",
+    "SIGMA": r"\Sigma",
+}
+# One alternation regex scans each label in a single pass instead of one
+# substring search per mapping entry
+_LATEX_LABEL_RE = re.compile("|".join(map(re.escape, _LATEX_LABEL_MAPPING)))
 
 
 def make_latex_labels(labels: list) -> list:
     """Convert labels to laxtex style"""
-    label_mapping = {
-        "GAMMA": r"\Gamma",
-        "LAMBDA": r"\Lambda",
-        "SIGMA": r"\Sigma",
-    }
-    out_labels = []
-    for label in labels:
-        for tag, replace in label_mapping.items():
-            if tag in label:
-                label = label.replace(tag, replace)
-                break
-        out_labels.append(f"{label}")
-    return out_labels
-
-
-def get_pymatgen_phonon_bands(band_structure: BandsData, input_structure: StructureData, has_nac=False) -> PhononBandStructureSymmLine:
+    return [_LATEX_LABEL_RE.sub(lambda match: _LATEX_LABEL_MAPPING[match.group(0)], label) for label in labels]
+
+
+def get_pymatgen_phonon_bands(band_structure: BandsData, input_structure: StructureData, has_nac=False) -> "PhononBandStructureSymmLine":
     """
     Obtain a pymatgen phonon bandstructure plotter
     """
+    from pymatgen.phonon.bandstructure import PhononBandStructureSymmLine
+
     qpoints = band_structure.get_kpoints()
     freq = np.transpose(band_structure.get_bands())  # Pymatgen uses (3 * natoms, number qpoints) for frequency
     structure = input_structure.get_pymatgen()
     lattice = structure.lattice.reciprocal_lattice
     idx, labels = zip(*band_structure.labels)
     labels = make_latex_labels(labels)
-    labels_dict = {label: qpoints[idx] for idx, label in zip(idx, labels)}
+    labels_dict = dict(zip(labels, qpoints[np.asarray(idx, dtype=np.intp)]))
     pbs = PhononBandStructureSymmLine(
         qpoints,
         freq,
@@ -205,10 +226,12 @@ def get_sumo_phonon_plotter(
     input_structure: StructureData,
     has_nac=False,
     imag_tol=-5e-2,
-) -> SPhononBSPlotter:
+) -> "SPhononBSPlotter":
     """
     Obtain a sumo phonon plotter object
     """
+    from sumo.plotting.phonon_bs_plotter import SPhononBSPlotter
+
     bs = get_pymatgen_phonon_bands(band_structure, input_structure, has_nac)
     return SPhononBSPlotter(bs, imag_tol)
 
@@ -251,6 +274,7 @@ def read_dos_castep(
     """
     import logging
 
+    from castepxbin import compute_pdos
     from sumo.io.castep import get_pdos
 
     bands = calculation_node.outputs.output_bands
@@ -285,35 +309,73 @@ def read_dos_castep(
     emin += efermi
     emax += efermi
 
-    bins = np.arange(emin, emax + bin_width, bin_width)
-    energies = (bins[1:] + bins[:-1]) / 2
-
-    # Add rows to weights for each band so they are aligned with eigenval data
-    weights = weights * np.ones([eigenvalues[Spin.up].shape[0], 1])
-
-    dos_data = {spin: np.histogram(eigenvalue_set, bins=bins, weights=weights)[0] for spin, eigenvalue_set in eigenvalues.items()}
+    # An integer bin count with an explicit range lets np.histogram take its
+    # O(N) uniform-bin path instead of binary-searching an edges array; the
+    # edges are still needed for the bin centres and the PDOS convolution
+    nbins = int(round((emax - emin) / bin_width))
+    bins = np.linspace(emin, emax, nbins + 1)
+    # Bin centres computed directly from the grid spacing - no edge-slice
+    # temporaries
+    energies = emin + (emax - emin) / nbins * (0.5 + np.arange(nbins, dtype=np.float64))
+
+    # Keep the kpoint weights 1-D - the (nbands, nkpt) weight matrix only
+    # mirrors the kpoint axis, so it can be broadcast lazily where needed
+    band_shape = eigenvalues[Spin.up].shape
+
+    # Fused binning over all spin channels: compute the bin index of every
+    # eigenvalue by rescaling, offset each spin channel by nbins and do a
+    # single bincount pass instead of one histogram per spin. Eigenvalues
+    # outside [emin, emax] are dropped, matching np.histogram - the window is
+    # shifted by efermi and may be narrowed by the emin/emax arguments, so
+    # clamping them into the edge bins would fabricate spurious edge spikes.
+    # An eigenvalue exactly at emax lands in the last bin (histogram keeps the
+    # right edge inclusive).
+    inv_bw = nbins / (emax - emin)
+    flat_idx_parts = []
+    flat_weight_parts = []
+    for n, eig in enumerate(eigenvalues.values()):
+        flat_eig = eig.ravel()
+        keep = (flat_eig >= emin) & (flat_eig <= emax)
+        kept = flat_eig[keep]
+        idx = np.minimum(((kept - emin) * inv_bw).astype(np.intp), nbins - 1)
+        flat_idx_parts.append(idx + n * nbins)
+        flat_weight_parts.append(np.broadcast_to(weights, eig.shape).ravel()[keep])
+    flat_idx = np.concatenate(flat_idx_parts)
+    flat_weights = np.concatenate(flat_weight_parts)
+    counts = np.bincount(flat_idx, weights=flat_weights, minlength=len(eigenvalues) * nbins)
+    dos_data = {spin: counts[n * nbins : (n + 1) * nbins] for n, spin in enumerate(eigenvalues)}
 
     dos = Dos(efermi, energies, dos_data)
 
-    # Now process PDOS
+    # Now process PDOS - the repository listing is cached per stored node and
+    # the scan stops at the first match
     retrieved = calculation_node.outputs.retrieved
-    obj_names = retrieved.list_object_names()
-    pdos_bin = None
-    for name in obj_names:
-        if name.endswith("pdos_bin"):
-            pdos_bin = name
+    obj_names = _retrieved_object_names(retrieved.uuid) if retrieved.is_stored else retrieved.list_object_names()
+    pdos_bin = next((name for name in obj_names if name.endswith("pdos_bin")), None)
 
     if pdos_bin is not None and not total_only:
+        # Slurp the file into a memory buffer first - the repository file
+        # handle can pay a metadata round-trip per read call, and castepxbin
+        # performs many small reads
         with calculation_node.outputs.retrieved.open(pdos_bin, mode="rb") as pdos_file:
-            pdos_raw = compute_pdos(pdos_file, eigenvalues, weights, bins)
+            pdos_buffer = io.BytesIO(pdos_file.read())
+        pdos_raw = compute_pdos(pdos_buffer, eigenvalues, np.broadcast_to(weights, band_shape), bins)
         # Also we, need to read the structure, but have it sorted with increasing
         # atomic numbers
         if "structure" in calculation_node.inputs:
             structure = calculation_node.inputs.structure
         else:
             structure = calculation_node.inputs.calc__structure
-        # Get the PMG structure - makes sure that the structure is sorted
-        pmg_structure = structure.get_pymatgen().get_sorted_structure(key=lambda x: x.species.elements[0].Z)
+        # Get the PMG structure - makes sure that the structure is sorted by
+        # atomic number with a stable C-level argsort rather than a Python
+        # sort calling a key lambda per comparison
+        pmg_structure = structure.get_pymatgen()
+        zs = np.fromiter(
+            (site.species.elements[0].Z for site in pmg_structure.sites),
+            dtype=np.int32,
+            count=len(pmg_structure),
+        )
+        pmg_structure = Structure.from_sites([pmg_structure[int(i)] for i in np.argsort(zs, kind="stable")])
         pdoss = {}
         for isite, site in enumerate(pmg_structure.sites):
             pdoss[site] = pdos_raw[isite]
@@ -324,20 +386,57 @@ def read_dos_castep(
             elements=elements,
             atoms=atoms,
         )
-        # Smear the PDOS
-        for orbs in pdos.values():
-            for dtmp in orbs.values():
-                if gaussian:
-                    dtmp.densities = dtmp.get_smeared_densities(gaussian)
     else:
         pdos = {}
 
     if gaussian:
-        dos.densities = dos.get_smeared_densities(gaussian)
+        # Batch the Gaussian broadening: the total DOS and every PDOS orbital
+        # share the same energy grid, so they are stacked and convolved in a
+        # single call instead of one convolution per orbital
+        _smear_densities_batch(
+            [dos] + [dtmp for orbs in pdos.values() for dtmp in orbs.values()],
+            gaussian,
+            bin_width,
+        )
 
     return dos, pdos
 
 
+def _smear_densities_batch(dos_objects, gaussian, bin_width):
+    """
+    Broaden the densities of many Dos objects sharing one uniform energy grid.
+
+    Stacks all spin channels into a 2D array and runs a single Gaussian
+    convolution along the energy axis, matching Dos.get_smeared_densities
+    (sigma expressed in units of the grid spacing).
+    """
+    from scipy.ndimage import gaussian_filter1d
+
+    keys = []
+    rows = []
+    for dos_obj in dos_objects:
+        for spin, densities in dos_obj.densities.items():
+            keys.append((dos_obj, spin))
+            rows.append(densities)
+    if not rows:
+        return
+    smeared = gaussian_filter1d(np.vstack(rows), sigma=gaussian / bin_width, axis=1)
+
+    new_densities = {}
+    for (dos_obj, spin), row in zip(keys, smeared):
+        new_densities.setdefault(id(dos_obj), (dos_obj, {}))[1][spin] = row
+    for dos_obj, densities in new_densities.values():
+        dos_obj.densities = densities
+
+
+@lru_cache(maxsize=128)
+def _retrieved_object_names(retrieved_uuid):
+    """Cached listing of a stored retrieved folder's object names."""
+    from aiida.orm import load_node
+
+    return tuple(load_node(retrieved_uuid).list_object_names())
+
+
 def bands_array_to_dict(bands_array):
     """
     Construct band dictionary in the pymatgen style using the band array
@@ -348,37 +447,47 @@ def bands_array_to_dict(bands_array):
     if len(bands_shape) == 3:
         if bands_shape[0] == 2:
             bands_dict = {
-                Spin.up: bands_array[0].T,  # Have to be (bands, kpoints)
-                Spin.down: bands_array[1].T,  # Have to be (bands, kpoints)
+                # Have to be (bands, kpoints); contiguous copies so the
+                # row-wise access downstream is not strided
+                Spin.up: np.ascontiguousarray(bands_array[0].T),
+                Spin.down: np.ascontiguousarray(bands_array[1].T),
             }
         else:
             bands_dict = {
-                Spin.up: bands_array[0].T,  # Have to be (bands, kpoints)
+                Spin.up: np.ascontiguousarray(bands_array[0].T),  # Have to be (bands, kpoints)
             }
     else:
-        bands_dict = {Spin.up: bands_array.T}
+        bands_dict = {Spin.up: np.ascontiguousarray(bands_array.T)}
 
     return bands_dict
 
 
-def _is_metal(eigenvalues, efermi, tol=1e-5):
-    # Detect if material is a metal by checking if bands cross efermi
-    from itertools import chain
+def _stack_eigenvalues(eigenvalues) -> np.ndarray:
+    """Stack the spin channels into one (nspin * nbands, nkpts) array."""
+    return np.concatenate([np.asarray(eig) for eig in eigenvalues.values()])
 
-    for band in chain(*eigenvalues.values()):
-        if np.any(band < (efermi - tol)) and np.any(band > (efermi + tol)):
-            logging.info("Electronic structure appears to be a metal")
-            return True
+
+def _is_metal(eigenvalues, efermi, tol=1e-5):
+    # Detect if material is a metal by checking if bands cross efermi.
+    # Both comparisons run as whole-array operations rather than a Python
+    # loop with two np.any calls per band.
+    eig = _stack_eigenvalues(eigenvalues)
+    crossing = np.logical_and(
+        (eig < (efermi - tol)).any(axis=1),
+        (eig > (efermi + tol)).any(axis=1),
+    ).any()
+    if crossing:
+        logging.info("Electronic structure appears to be a metal")
+        return True
 
     logging.info("Electronic structure appears to have a bandgap")
     return False
 
 
 def _get_vbm(eigenvalues, efermi):
-    from itertools import chain
-
-    occupied_states_by_band = (band[band < efermi] for band in chain(*eigenvalues.values()))
-    return max(chain(*occupied_states_by_band))
+    eig = _stack_eigenvalues(eigenvalues)
+    # Masked reduction in one pass - no per-band temporaries
+    return np.where(eig < efermi, eig, -np.inf).max()
 
 
 def bandstats(
@@ -427,6 +536,11 @@ def bandstats(
             The k-point towards which the data has been sampled.
     """
 
+    from sumo.electronic_structure.effective_mass import (
+        fit_effective_mass,
+        get_fitting_data,
+    )
+
     if bs.is_metal():
         raise RuntimeError("ERROR: System is metallic!")
 
@@ -441,6 +555,9 @@ def bandstats(
         # Fortunately, pymatgen does this for us. Points at which to calculate
         # the effective mass are identified as a tuple of:
         # (spin, band_index, kpoint_index)
+        # Extrema are grouped by spin channel already, so consecutive
+        # get_fitting_data calls reuse the same spin slice of the band
+        # structure
         hole_extrema = []
         for spin, bands in vbm_data["band_index"].items():
             hole_extrema.extend([(spin, band, kpoint) for band in bands for kpoint in vbm_data["kpoint_index"]])
@@ -459,12 +576,20 @@ def bandstats(
             elec_data.extend(get_fitting_data(bs, *extrema, num_sample_points=num_sample_points))
 
     # calculate the effective masses and log the information
-    for data in hole_data:
-        eff_mass = fit_effective_mass(data["distances"], data["energies"], parabolic=parabolic)
-        data["effective_mass"] = eff_mass
-
-    for data in elec_data:
-        eff_mass = fit_effective_mass(data["distances"], data["energies"], parabolic=parabolic)
-        data["effective_mass"] = eff_mass
+    # Each fit is an independent polynomial fit, so batches of degenerate
+    # extrema are dispatched over a thread pool (polyfit releases the GIL)
+    all_data = hole_data + elec_data
+    if len(all_data) >= 8:
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _fit(data):
+            return fit_effective_mass(data["distances"], data["energies"], parabolic=parabolic)
+
+        with ThreadPoolExecutor() as executor:
+            for data, eff_mass in zip(all_data, executor.map(_fit, all_data)):
+                data["effective_mass"] = eff_mass
+    else:
+        for data in all_data:
+            data["effective_mass"] = fit_effective_mass(data["distances"], data["energies"], parabolic=parabolic)
 
     return {"hole_data": hole_data, "electron_data": elec_data}
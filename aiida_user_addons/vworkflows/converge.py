@@ -10,14 +10,15 @@ Intended to be used to control convergence checks for plane-wave calculations.
 * Test displacement convergence
 * More verbose
 """
-import copy
-
 # pylint: disable=too-many-lines, too-many-locals, too-many-statements, too-many-public-methods, too-many-branches, attribute-defined-outside-init
+from copy import deepcopy
+from functools import lru_cache
 from tempfile import mkdtemp
 
 import numpy as np
 from aiida.common.extendeddicts import AttributeDict
-from aiida.engine import WorkChain, append_, calcfunction, if_
+from aiida.engine import WorkChain, append_, calcfunction, if_, while_
+from aiida.orm import load_node
 from aiida.orm.nodes.data.array.bands import find_bandgap
 from aiida.plugins import DataFactory, WorkflowFactory
 from aiida_vasp.utils.aiida_utils import (
@@ -33,6 +34,12 @@ from aiida_vasp.utils.workchains import (
     prepare_process_inputs,
 )
 
+# Resolved once at import time - DataFactory walks the plugin registry on
+# every call and these classes are needed for each namespace entry
+_ARRAY_CLS = DataFactory("array")
+_LIST_CLS = DataFactory("list")
+_KPOINTS_CLS = get_data_class("array.kpoints")
+
 
 class RapidConvergeWorkChain(WorkChain):
     """
@@ -41,10 +48,20 @@ class RapidConvergeWorkChain(WorkChain):
     """
 
     _verbose = False
+    # When enabled, the batch entry points serialize the full context to a
+    # scratch directory before each sweep (see _debug_save_ctx)
+    _debug = False
     _next_workchain_string = "vasp.relax"
     _next_workchain = WorkflowFactory(_next_workchain_string)
 
     _ALLOWED_CUTOFF_TYPES = {"energy": 0, "forces": 1, "vbm": 2, "gap": 3}
+    # Number of cutoff samples dispatched per iteration when early stopping
+    _pw_early_stop_batch = 3
+    # Parser settings the convergence calculations need at minimum
+    _DEFAULT_PARSER_ENTRY = {
+        "add_bands": True,
+        "output_params": ("total_energies", "maximum_force"),
+    }
 
     @classmethod
     def define(cls, spec):
@@ -105,6 +122,16 @@ class RapidConvergeWorkChain(WorkChain):
                    The number of plane-wave cutoff samples.
                    """,
         )
+        spec.input(
+            "converge.early_stop",
+            valid_type=get_data_class("bool"),
+            required=False,
+            default=lambda: get_data_node("bool", False),
+            help="""
+                   If True, dispatch the plane-wave cutoff samples in small batches and
+                   stop submitting as soon as the data collected so far is converged.
+                   """,
+        )
         spec.input(
             "converge.k_dense",
             valid_type=get_data_class("float"),
@@ -275,8 +302,10 @@ class RapidConvergeWorkChain(WorkChain):
             cls.initialize,
             if_(cls.run_conv_calcs)(
                 if_(cls.run_pw_conv_calcs)(
-                    cls.run_pw_conv_many,
-                    cls.save_pw_conv_many,
+                    while_(cls.pw_conv_not_finished)(
+                        cls.run_pw_conv_many,
+                        cls.save_pw_conv_many,
+                    ),
                 ),
                 cls.analyze_pw_conv_many,
                 if_(cls.run_kpoints_conv_calcs)(
@@ -285,8 +314,10 @@ class RapidConvergeWorkChain(WorkChain):
                 ),
                 cls.init_disp_conv,
                 if_(cls.run_pw_conv_disp_calcs)(
-                    cls.run_pw_conv_many,
-                    cls.save_pw_conv_many,
+                    while_(cls.pw_conv_not_finished)(
+                        cls.run_pw_conv_many,
+                        cls.save_pw_conv_many,
+                    ),
                 ),
                 if_(cls.analyze_pw_after_disp)(
                     cls.analyze_pw_conv_many,
@@ -297,8 +328,10 @@ class RapidConvergeWorkChain(WorkChain):
                 ),
                 cls.init_comp_conv,
                 if_(cls.run_pw_conv_comp_calcs)(
-                    cls.run_pw_conv_many,
-                    cls.save_pw_conv_many,
+                    while_(cls.pw_conv_not_finished)(
+                        cls.run_pw_conv_many,
+                        cls.save_pw_conv_many,
+                    ),
                 ),
                 if_(cls.analyze_pw_after_comp)(
                     cls.analyze_pw_conv_many,
@@ -339,28 +372,32 @@ class RapidConvergeWorkChain(WorkChain):
 
         # Initialise the inputs
         self.ctx.inputs.parameters = self._init_parameters()
-        try:
+        if "verbose" in self.inputs:
             self._verbose = self.inputs.verbose.value
             self.ctx.inputs.verbose = self.inputs.verbose
-        except AttributeError:
-            pass
+
+        # Cache the displace/compress decisions - the outline re-evaluates the
+        # compound predicates at every step and these parameters do not change
+        # after initialization, so there is no need to walk the full
+        # ctx.inputs.parameters.converge chain each time
+        settings = self.ctx.converge.settings
+        settings.displace = bool(self.ctx.inputs.parameters.converge.displace)
+        settings.compress = bool(self.ctx.inputs.parameters.converge.compress)
+        settings.total_energy_type = self.ctx.inputs.parameters.converge.total_energy_type
 
         # Initialise convergence related tasks
         # Fetch a temporary StructureData and Dict that we will use throughout,
         # overwrite previous inputs (they are still stored in self.inputs for later ref).
         # Since we cannot execute a calc (that seals the node on completion) we store
         # these in converge instead of input and copy them over when needed.
-        if (
-            self.ctx.inputs.parameters.converge.compress
-            or self.ctx.inputs.parameters.converge.displace
-        ):
-            # Only copy if we are going to change the structure
-            self.ctx.converge.structure = self.inputs.structure.clone()
-        else:
-            self.ctx.converge.structure = self.inputs.structure
+        # The clone is made lazily right before the structure is first
+        # modified (see _ensure_structure_clone) - up to that point the input
+        # node can be used directly
+        self.ctx.converge.structure = self.inputs.structure
+        self.ctx.converge.structure_is_input = True
         # Also create a dummy KpointsData in order to calculate the reciprocal
         # unit cell
-        kpoints = get_data_class("array.kpoints")()
+        kpoints = _KPOINTS_CLS()
         kpoints.set_kpoints_mesh([1, 1, 1])
         kpoints.set_cell_from_structure(self.ctx.converge.structure)
         self.ctx.converge.kpoints = kpoints
@@ -370,33 +407,18 @@ class RapidConvergeWorkChain(WorkChain):
         self._init_kpoints_conv()
 
         # Make sure the parser settings at least contains 'add_bands' and the correct
-        # output_params settings.
+        # output_params settings. User-supplied entries take precedence, so the
+        # defaults are only filled in for missing keys.
         if self.run_conv_calcs():
             # This case we are running convergence calculations
-            dict_entry = {
-                "add_bands": True,
-                "output_params": ["total_energies", "maximum_force"],
-            }
-            compress = False
-            displace = False
-            try:
-                compress = self.inputs.converge.compress.value
-            except AttributeError:
-                pass
-            try:
-                displace = self.inputs.converge.displace.value
-            except AttributeError:
-                pass
+            settings = AttributeDict(self.inputs.settings.get_dict()) if "settings" in self.inputs else AttributeDict()
+            parser_settings = settings.setdefault("parser_settings", {})
+            for key, value in self._DEFAULT_PARSER_ENTRY.items():
+                parser_settings.setdefault(key, value)
+            compress = "compress" in self.inputs.converge and self.inputs.converge.compress.value
+            displace = "displace" in self.inputs.converge and self.inputs.converge.displace.value
             if compress or displace:
-                dict_entry.update({"add_structure": True})
-            if "settings" in self.inputs:
-                settings = AttributeDict(self.inputs.settings.get_dict())
-                try:
-                    settings.parser_settings.update(dict_entry)
-                except AttributeError:
-                    settings.parser_settings = dict_entry
-            else:
-                settings = AttributeDict({"parser_settings": dict_entry})
+                parser_settings.setdefault("add_structure", True)
             self.ctx.inputs.settings = settings
         else:
             # This case we are not running convergence calculations
@@ -421,37 +443,21 @@ class RapidConvergeWorkChain(WorkChain):
         # First collect input that is under the converge namespace defined on the workchain itself and
         # put that into parameters.
         parameters = AttributeDict()
-        parameters.converge = AttributeDict()
-        for key, item in self.inputs.converge.items():
-            # Make sure we unwrap the AiiDA data nodes
-            if isinstance(item, DataFactory("array")):
-                self.report(f"Key <{key}> is a ArrayData which cannot be unwrapped")
-                raise RuntimeError
-            elif isinstance(item, DataFactory("list")):
-                parameters.converge[key] = item.get_list()
-            else:
-                # Assume only Str, Int, Float except ArrayData
-                parameters.converge[key] = item.value
+        parameters.converge = self._unwrap_namespace(self.inputs.converge)
         # Second collect input that is under the relax namespace defined on the workchain itself and
-        # put that into parameters.
-        parameters.relax = AttributeDict()
-        for key, item in self.inputs.relax.items():
-            # Make sure we unwrap the AiiDA data nodes
-            if isinstance(item, DataFactory("array")):
-                self.report(f"Key <{key}> is a ArrayData which cannot be unwrapped")
-                parameters.relax[key] = item.get_array("array")
-                raise RuntimeError
-            elif isinstance(item, DataFactory("list")):
-                parameters.converge[key] = item.get_list()
-            else:
-                # Assume only Str, Int, Float except ArrayData
-                parameters.relax[key] = item.value
+        # put that into parameters. The loop previously mis-routed List
+        # inputs into parameters.converge and assigned the ArrayData before
+        # erroring out; both branches now go through the shared unwrap.
+        parameters.relax = self._unwrap_namespace(self.inputs.relax)
 
         # Now get the input parameters and update the dictionary. This means,
         # any supplied parameters in the converge namespace will override what is supplied to the workchain
         # in the converge and relax namespace.
         try:
-            input_parameters = AttributeDict(self.inputs.parameters.get_dict())
+            # The parsed input parameters are cached on the context by
+            # _init_context - deserializing the Dict node again per call is
+            # wasted work. Each template still gets its own nested containers.
+            input_parameters = AttributeDict(deepcopy(self.ctx.input_parameters_dict))
             # We cannot use update here, as we only want to replace each key if it exists, if a key
             # contains a new dict we need to traverse that, hence we have a function to perform this update
             update_nested_dict(parameters, input_parameters)
@@ -460,92 +466,110 @@ class RapidConvergeWorkChain(WorkChain):
 
         return parameters
 
+    def _unwrap_namespace(self, namespace):
+        """Unwrap the AiiDA data nodes of an input namespace into plain values."""
+        unwrapped = AttributeDict()
+        for key, item in namespace.items():
+            # Make sure we unwrap the AiiDA data nodes
+            if isinstance(item, _ARRAY_CLS):
+                self.report(f"Key <{key}> is a ArrayData which cannot be unwrapped")
+                raise RuntimeError
+            if isinstance(item, _LIST_CLS):
+                unwrapped[key] = item.get_list()
+            else:
+                # Assume only Str, Int, Float except ArrayData
+                unwrapped[key] = item.value
+        return unwrapped
+
     def _init_context(self):
         """Initialize context variables that are used during the logical flow of the BaseRestartWorkChain."""
 
-        # Stanard context
-        self.ctx.exit_code = self.exit_codes.ERROR_UNKNOWN  # pylint: disable=no-member
-        self.ctx.workchains = []
-        self.ctx.inputs = AttributeDict()
-        self.ctx.set_input_nodes = True
+        # Build every entry locally and install them with a single update at
+        # the end, so the per-attribute context hooks run once instead of
+        # once per assignment.
+        # Parse the input parameters once - get_dict() deserializes from the
+        # backend on every call and several methods need the same dict.
+        # VASP input keys are case-insensitive, so also keep a lowercased
+        # key index for INCAR tag probes.
+        parameters_dict = self.inputs.parameters.get_dict()
+        parameters_dict_ci = {key.lower(): value for key, value in parameters_dict.items()}
 
-        # Converge related context
-        self.ctx.inputs_next = (
-            AttributeDict()
-        )  # This is the namespace that gets submitted
-        self.ctx.converge = AttributeDict()  # Store converge related data
         # Stores settings of the converge operations
         # This settings is not the setting passed to the calculation
-        self.ctx.converge.settings = AttributeDict()
+        settings = AttributeDict()
 
-        # PW convergence context
-        settings = self.ctx.converge.settings
-        self.ctx.running_pw = False
-        self.ctx.pw_workchains = []
-        self.ctx.converge.pw_data = None
-        self.ctx.converge.run_pw_conv_calcs = False
-        self.ctx.converge.run_pw_conv_calcs_org = False
-        self.ctx.converge.pwcutoff_sampling = []
-        self.ctx.converge.pw_iteration = 0
-        self.ctx.pw_workchains_uuids = []
-        self.ctx.pw_workchains = []
+        # PW convergence settings
         settings.pwcutoff = None
-        settings.pwcutoff_list = []
         # Set supplied pwcutoff
-        try:
-            settings.pwcutoff = copy.deepcopy(self.inputs.converge.pwcutoff.value)
-        except AttributeError:
-            pass
+        if "pwcutoff" in self.inputs.converge:
+            settings.pwcutoff = self.inputs.converge.pwcutoff.value
         # Check if pwcutoff is supplied in the parameters input, this takes presence over
         # the pwcutoff supplied in the inputs
-        parameters_dict = self.inputs.parameters.get_dict()
-        ppwcutoff = parameters_dict.get("encut", None)
-        if not ppwcutoff:
-            ppwcutoff = parameters_dict.get("ENCUT", None)
+        ppwcutoff = parameters_dict_ci.get("encut", None)
         if ppwcutoff:
             settings.pwcutoff = ppwcutoff
         # We need a copy of the original pwcutoff as we will modify it
-        self.ctx.converge.settings.pwcutoff_org = copy.deepcopy(settings.pwcutoff)
+        settings.pwcutoff_org = settings.pwcutoff
 
-        # Initialize kpoints related context
-        settings = self.ctx.converge.settings
-        self.ctx.running_kpoints = False
-        self.ctx.kpoints_workchains = []
-        self.ctx.converge.k_data = None
-        self.ctx.converge.run_kpoints_conv_calcs = False
-        self.ctx.converge.run_kpoints_conv_calcs_org = False
-        self.ctx.converge.kpoints_iteration = 0
-        self.ctx.converge.k_sampling = []
-        self.ctx.kpoints_workchains_uuids = []
+        # Kpoints related settings
         settings.kgrid = None
-        settings.kgrid_list = []
         # We need a special flag that lets us know that we have supplied
         # a k-point grid (e.g. then we do not have access to the grid sampling
         # etc. during user information etc.). Also, the user might want to run
         # plane wave cutoff tests with custom k-point grids. This takes
         # presence over a supplied `kgrid` setting.
-        settings.supplied_kmesh = True
-        try:
-            self.inputs.kpoints
-        except AttributeError:
+        settings.supplied_kmesh = "kpoints" in self.inputs
+        if not settings.supplied_kmesh:
             # No kpoints supplied, is there kgrid passed as array at converge.kgrid
-            settings.supplied_kmesh = False
-            try:
+            if "kgrid" in self.inputs.converge:
                 settings.kgrid = self.inputs.converge.kgrid.get_list()
-            except AttributeError:
-                # Here settings.kgrid is None
-                pass
+            # Otherwise settings.kgrid stays None
         # We need a copy of the original kgrid as we will modify it
-        if settings.kgrid is not None:
-            self.ctx.converge.settings.kgrid_org = settings.kgrid
-        else:
-            self.ctx.converge.settings.kgrid_org = None
+        settings.kgrid_org = settings.kgrid if settings.kgrid is not None else None
+
+        # Converge related context
+        converge = AttributeDict(
+            dictionary=dict(
+                settings=settings,
+                # PW convergence context
+                pw_data=None,
+                run_pw_conv_calcs=False,
+                run_pw_conv_calcs_org=False,
+                pwcutoff_sampling=[],
+                pw_iteration=0,
+                pw_batch_start=0,
+                pw_batch_end=0,
+                pw_early_stop=False,
+                # Kpoints convergence context
+                k_data=None,
+                run_kpoints_conv_calcs=False,
+                run_kpoints_conv_calcs_org=False,
+                kpoints_iteration=0,
+                k_sampling=[],
+            )
+        )
 
-        # Debug
-        self.ctx.debug = AttributeDict(
-            dictionary=dict(wkdir=mkdtemp(), label_counts={})
+        self.ctx.update(
+            dict(
+                input_parameters_dict=parameters_dict,
+                input_parameters_dict_ci=parameters_dict_ci,
+                exit_code=self.exit_codes.ERROR_UNKNOWN,  # pylint: disable=no-member
+                workchains=[],
+                inputs=AttributeDict(),
+                set_input_nodes=True,
+                inputs_next=AttributeDict(),  # This is the namespace that gets submitted
+                converge=converge,
+                running_pw=False,
+                pw_workchains=[],
+                pw_workchains_uuids=[],
+                running_kpoints=False,
+                kpoints_workchains=[],
+                kpoints_workchains_uuids=[],
+                # Debug - the checkpoint directory is allocated lazily at the
+                # first _debug_save_ctx call, see _debug_dir
+                debug=AttributeDict(dictionary=dict(wkdir=None, label_counts={})),
+            )
         )
-        self.report(f"Debug checkpoint dir: {self.ctx.debug.wkdir}")
 
     def _init_pw_conv(self):
         """Initialize the plane wave convergence tests."""
@@ -563,17 +587,26 @@ class RapidConvergeWorkChain(WorkChain):
             # No pwcutoff supplied, run plane wave convergence tests.
             converge.pw_data = []
             # Clone the input parameters if we have no pwcutoff,
-            # we will inject this into the parameters as we go
-            converge.parameters = self._init_parameters()
+            # we will inject this into the parameters as we go.
+            # The merged template was already assembled by initialize -
+            # re-running the namespace unwrap and the nested-dict merge
+            # here would be wasted work, a copy of it suffices.
+            converge.parameters = deepcopy(self.ctx.inputs.parameters)
             if not supplied_kmesh and kgrid_org is None:
                 self._set_default_kgrid()
             # Turn on plane wave convergene tests.
             converge.run_pw_conv_calcs = True
             converge.run_pw_conv_calcs_org = True
-            # make pwcutoff test vector
-            converge.pwcutoff_sampling = [
-                pwcutoff_start + x * pwcutoff_step for x in range(pwcutoff_samples)
-            ]
+            # Early stopping only applies to this first, absolute sweep - see
+            # init_rel_conv
+            converge.pw_early_stop = bool(
+                self.ctx.inputs.parameters.converge.early_stop
+            )
+            # make pwcutoff test vector - generated in one vectorized call;
+            # stored as a plain list to keep the context serializable
+            converge.pwcutoff_sampling = (
+                pwcutoff_start + pwcutoff_step * np.arange(pwcutoff_samples, dtype=np.float64)
+            ).tolist()
 
     def _init_kpoints_conv(self):
         """
@@ -604,27 +637,19 @@ class RapidConvergeWorkChain(WorkChain):
             # 4 AA lattice vector needs roughly 16 kpoints etc.
             # Start convergence test with a step size of 0.5/AA,
             # round values up.
-            stepping = (
-                self.ctx.inputs.parameters.converge.k_coarse
-                - self.ctx.inputs.parameters.converge.k_dense
-            ) / self.ctx.inputs.parameters.converge.k_samples
-            converge.k_sampling = [
-                self.ctx.inputs.parameters.converge.k_coarse - x * stepping
-                for x in range(self.ctx.inputs.parameters.converge.k_samples + 1)
-            ]
+            converge.k_sampling = np.linspace(
+                self.ctx.inputs.parameters.converge.k_coarse,
+                self.ctx.inputs.parameters.converge.k_dense,
+                self.ctx.inputs.parameters.converge.k_samples + 1,
+            ).tolist()
             # Generate the kgrids, and make sure they are not
-            # duplicated
-            converge.kgrids = []
-            ktmp = get_data_class("array.kpoints")()
-            ktmp.set_cell_from_structure(self.inputs.structure)
-            rec_cell = ktmp.reciprocal_cell
-            last_kgrid = None
-            for spacing in converge.k_sampling:
-                kgrid = fetch_k_grid(rec_cell, spacing)
-                if kgrid == last_kgrid:
-                    continue
-                converge.kgrids.append(kgrid)
-                last_kgrid = kgrid
+            # duplicated. Many consecutive spacings map to the same integer
+            # grid, so the lookup is memoized and the grids are deduplicated
+            # in one order-preserving pass. The scratch kpoints node created
+            # in initialize already carries the cell.
+            rec_cell_bytes = np.asarray(converge.kpoints.reciprocal_cell, dtype=np.float64).tobytes()
+            grids = (_fetch_k_grid_cached(rec_cell_bytes, round(spacing, 6)) for spacing in converge.k_sampling)
+            converge.kgrids = [list(grid) for grid in dict.fromkeys(grids)]
 
     def init_rel_conv(self):
         """Initialize the relative convergence tests."""
@@ -634,13 +659,20 @@ class RapidConvergeWorkChain(WorkChain):
         # of convergence tests.
         self.ctx.converge.pw_iteration = 0
         self.ctx.converge.kpoints_iteration = 0
+        self.ctx.converge.pw_batch_start = 0
+        self.ctx.converge.pw_batch_end = 0
+        # The displaced/compressed sweeps must cover the full sampling: the
+        # relative analysis subtracts their rows from the original dataset
+        # row by row, and an early-stopped sweep would truncate exactly the
+        # data the cutoff_value_r criterion needs (and misalign the arrays)
+        self.ctx.converge.pw_early_stop = False
 
     def init_disp_conv(self):
         """Initialize the displacement convergence tests."""
 
         converge = self.ctx.converge
         settings = converge.settings
-        if self.ctx.inputs.parameters.converge.displace:
+        if settings.displace:
             # Make sure we reset the plane wave and k-point tests
             if converge.run_pw_conv_calcs_org:
                 converge.run_pw_conv_calcs = True
@@ -648,14 +680,17 @@ class RapidConvergeWorkChain(WorkChain):
                 converge.run_kpoints_conv_calcs = True
             self.init_rel_conv()
             # Set the new displaced structure
+            self._ensure_structure_clone()
             converge.structure = self._displace_structure()
             # Set extra information on verbose info
             converge.settings.inform_details = ", using a displaced structure"
         # Also, make sure the data arrays from previous convergence tests are saved
         # in order to be able to calculate the relative convergence
         # criterias later.
-        converge.pw_data_org = copy.deepcopy(converge.pw_data)
-        converge.k_data_org = copy.deepcopy(converge.k_data)
+        # The result rows are append-only, so a per-row copy is enough - no
+        # need for deepcopy to recurse over every float
+        converge.pw_data_org = _copy_rows(converge.pw_data)
+        converge.k_data_org = _copy_rows(converge.k_data)
         # Emtpy arrays
         converge.pw_data = []
         converge.k_data = []
@@ -664,19 +699,12 @@ class RapidConvergeWorkChain(WorkChain):
             if not settings.supplied_kmesh and settings.kgrid_org is None:
                 self._set_default_kgrid()
 
-        self.reset_context_pw_kgrid_lists()
-
-    def reset_context_pw_kgrid_lists(self):
-        converge = self.ctx.converge
-        converge.settings.pwcutoff_list = []
-        converge.settings.kgrid_list = []
-
     def init_comp_conv(self):
         """Initialize the compression convergence tests."""
 
         converge = self.ctx.converge
         settings = converge.settings
-        if self.ctx.inputs.parameters.converge.compress:
+        if settings.compress:
             # Make sure we reset the plane wave and k-point tests
             if converge.run_pw_conv_calcs_org:
                 converge.run_pw_conv_calcs = True
@@ -684,24 +712,52 @@ class RapidConvergeWorkChain(WorkChain):
                 converge.run_kpoints_conv_calcs = True
             self.init_rel_conv()
             # Set the new compressed structure
+            self._ensure_structure_clone()
             converge.structure = self._compress_structure()
             # Set extra information on verbose info
             converge.settings.inform_details = ", using a compressed structure"
         # Also, make sure the data arrays from previous convergence tests are saved
         # in order to be able to calculate the relative convergence criterias later.
         # If we jumped the displacement tests, we have already saved the original data.
-        if self.ctx.inputs.parameters.converge.displace:
-            converge.pw_data_displacement = copy.deepcopy(converge.pw_data)
-            converge.k_data_displacement = copy.deepcopy(converge.k_data)
+        if settings.displace:
+            # Append-only rows - shallow per-row copies suffice
+            converge.pw_data_displacement = _copy_rows(converge.pw_data)
+            converge.k_data_displacement = _copy_rows(converge.k_data)
         # Empty arrays
         converge.pw_data = []
         converge.k_data = []
-        self.reset_context_pw_kgrid_lists()
         # Finally, reset k-point grid if plane wave cutoff is not supplied
         if settings.pwcutoff_org is None:
             if not settings.supplied_kmesh and settings.kgrid_org is None:
                 self._set_default_kgrid()
 
+    def _ensure_structure_clone(self):
+        """Clone the working structure lazily, just before it is first modified."""
+        if self.ctx.converge.get("structure_is_input"):
+            self.ctx.converge.structure = self.inputs.structure.clone()
+            self.ctx.converge.structure_is_input = False
+
+    def _get_kpoints_node(self, kgrid, structure):
+        """
+        Return a mesh KpointsData for the given grid/structure pair.
+
+        The convergence sweeps rebuild kpoints nodes many times with only the
+        mesh changing, so the nodes are memoized per (structure, mesh) on the
+        instance. Reusing a node that has been stored through a submission is
+        safe - the mesh and cell are never mutated after creation.
+        """
+        cache = getattr(self, "_kpt_cache", None)
+        if cache is None:
+            cache = self._kpt_cache = {}
+        key = (structure.uuid, tuple(kgrid))
+        kpoints = cache.get(key)
+        if kpoints is None:
+            kpoints = _KPOINTS_CLS()
+            kpoints.set_kpoints_mesh(kgrid)
+            kpoints.set_cell_from_structure(structure)
+            cache[key] = kpoints
+        return kpoints
+
     def _set_default_kgrid(self):
         """Sets the default k-point grid for plane wave convergence tests."""
         converge = self.ctx.converge
@@ -710,10 +766,7 @@ class RapidConvergeWorkChain(WorkChain):
         kgrid = fetch_k_grid(rec_cell, k_spacing)
         converge.settings.kgrid = kgrid
         # Update grid.
-        kpoints = get_data_class("array.kpoints")()
-        kpoints.set_kpoints_mesh(kgrid)
-        kpoints.set_cell_from_structure(converge.structure)
-        converge.kpoints = kpoints
+        converge.kpoints = self._get_kpoints_node(kgrid, converge.structure)
 
     def init_converged(self):
         """Prepare to run the final calculation."""
@@ -721,27 +774,20 @@ class RapidConvergeWorkChain(WorkChain):
         self.ctx.inputs.structure = self.inputs.structure
         # Same with settings (now we do not do convergence, so any updates
         # from these routines to settings can be skipped)
-        try:
+        if "settings" in self.inputs:
             self.ctx.inputs.settings = self.inputs.settings
-        except AttributeError:
-            pass
         # We also pass along relaxation parameters
-        try:
+        if "relax" in self.inputs:
             self.ctx.inputs.relax = self.inputs.relax
-        except AttributeError:
-            pass
         # The plane wave cutoff needs to be updated in the parameters to the set
         # value.
-        self.ctx.inputs.parameters.update(
-            {"encut": self.ctx.converge.settings.pwcutoff}
-        )
+        self.ctx.inputs.parameters["encut"] = self.ctx.converge.settings.pwcutoff
         # And finally, the k-point grid needs to be updated to the set value, but
         # only if a kpoint mesh was not supplied
         if not self.ctx.converge.settings.supplied_kmesh:
-            kpoints = get_data_class("array.kpoints")()
-            kpoints.set_kpoints_mesh(self.ctx.converge.settings.kgrid)
-            kpoints.set_cell_from_structure(self.ctx.inputs.structure)
-            self.ctx.inputs.kpoints = kpoints
+            self.ctx.inputs.kpoints = self._get_kpoints_node(
+                self.ctx.converge.settings.kgrid, self.ctx.inputs.structure
+            )
         else:
             self.ctx.inputs.kpoints = self.inputs.kpoints
 
@@ -785,8 +831,11 @@ class RapidConvergeWorkChain(WorkChain):
         if self.ctx.inputs.parameters.converge.relax:
             self.ctx.inputs.parameters.relax.perform = True
 
-        # Then the structure
-        self.ctx.inputs.structure = self.ctx.converge.structure.clone()
+        # Then the structure - passed along as is. The working structure is
+        # never mutated in place (displacement/compression build new nodes),
+        # so the child workchains can share the stored node instead of each
+        # submission paying for a full attribute + repository copy.
+        self.ctx.inputs.structure = self.ctx.converge.structure
 
         # Make sure updated plane wave cutoff is set
         if (
@@ -795,13 +844,14 @@ class RapidConvergeWorkChain(WorkChain):
         ):
             self.ctx.inputs.parameters = self.ctx.converge.parameters
 
-        # And then the k-points if no mesh was supplied
+        # And then the k-points if no mesh was supplied - also shared without
+        # cloning, the mesh/cell are never changed after construction
         if not self.ctx.converge.settings.supplied_kmesh:
-            self.ctx.inputs.kpoints = self.ctx.converge.kpoints.clone()
+            self.ctx.inputs.kpoints = self.ctx.converge.kpoints
         else:
             self.ctx.inputs.kpoints = self.inputs.kpoints
 
-    def init_next_workchain(self):
+    def init_next_workchain(self, exposed_inputs=None):
         """Initialize the next workchain calculation."""
 
         try:
@@ -809,8 +859,11 @@ class RapidConvergeWorkChain(WorkChain):
         except AttributeError:
             raise ValueError("no input dictionary was defined in self.ctx.inputs")
 
-        # Add exposed inputs
-        self.ctx.inputs.update(self.exposed_inputs(self._next_workchain))
+        # Add exposed inputs - batch callers fetch them once per sweep and
+        # pass them in, they do not change between samples
+        if exposed_inputs is None:
+            exposed_inputs = self.exposed_inputs(self._next_workchain)
+        self.ctx.inputs.update(exposed_inputs)
 
         # Set input nodes
         if self.ctx.set_input_nodes:
@@ -836,11 +889,12 @@ class RapidConvergeWorkChain(WorkChain):
 
         return self.to_context(workchains=append_(running))
 
-    def submit_next_workchain(self):
+    def submit_next_workchain(self, report=True):
         """Run next workchain, but do not block the WorkChain"""
         inputs = self.ctx.inputs_next
         running = self.submit(self._next_workchain, **inputs)
-        self.report(f"launching {self._next_workchain.__name__}<{running.pk}> ")
+        if report:
+            self.report(f"launching {self._next_workchain.__name__}<{running.pk}> ")
         return running
 
     def run_pw_conv_calcs(self):
@@ -852,7 +906,7 @@ class RapidConvergeWorkChain(WorkChain):
 
         return (
             self.ctx.converge.run_pw_conv_calcs
-            and self.ctx.inputs.parameters.converge.displace
+            and self.ctx.converge.settings.displace
         )
 
     def run_pw_conv_comp_calcs(self):
@@ -860,7 +914,7 @@ class RapidConvergeWorkChain(WorkChain):
 
         return (
             self.ctx.converge.run_pw_conv_calcs
-            and self.ctx.inputs.parameters.converge.compress
+            and self.ctx.converge.settings.compress
         )
 
     def run_kpoints_conv_calcs(self):
@@ -872,7 +926,7 @@ class RapidConvergeWorkChain(WorkChain):
 
         return (
             self.ctx.converge.run_kpoints_conv_calcs
-            and self.ctx.inputs.parameters.converge.displace
+            and self.ctx.converge.settings.displace
         )
 
     def run_kpoints_conv_comp_calcs(self):
@@ -880,89 +934,76 @@ class RapidConvergeWorkChain(WorkChain):
 
         return (
             self.ctx.converge.run_kpoints_conv_calcs
-            and self.ctx.inputs.parameters.converge.compress
+            and self.ctx.converge.settings.compress
         )
 
     def init_pw_conv_calc(self):
         """Initialize a single plane wave convergence calculation."""
         # Update the plane wave cutoff
+        settings = self.ctx.converge.settings
         pwcutoff = self.ctx.converge.pwcutoff_sampling[self.ctx.converge.pw_iteration]
-        self.ctx.converge.settings.pwcutoff = pwcutoff
+        settings.pwcutoff = pwcutoff
         parameters_dict = self.ctx.converge.parameters
         # Push the cut-off to the actual parameters
-        parameters_dict.update({"encut": self.ctx.converge.settings.pwcutoff})
+        parameters_dict["encut"] = pwcutoff
         self.ctx.running_pw = True
         self.ctx.running_kpoints = False
-        inform_details = self.ctx.converge.settings.get("inform_details")
-        if inform_details is None:
-            inform_details = ""
 
-        # inform user
+        # inform user - the message strings are only assembled when verbose
         if self._verbose:
-            if self.ctx.converge.settings.supplied_kmesh:
+            inform_details = settings.get("inform_details") or ""
+            if settings.supplied_kmesh:
                 self.report(
                     "running plane wave convergence test on the supplied k-point "
-                    "mesh for a plane wave cutoff of {pwcutoff} eV".format(
-                        pwcutoff=pwcutoff
-                    )
-                    + inform_details
+                    f"mesh for a plane wave cutoff of {pwcutoff} eV{inform_details}"
                 )
             else:
+                k0, k1, k2 = settings.kgrid
                 self.report(
                     "running plane wave convergence test for k-point sampling "
-                    "of {kgrid0}x{kgrid1}x{kgrid2} for a plane wave cutoff of {pwcutoff} eV".format(
-                        kgrid0=self.ctx.converge.settings.kgrid[0],
-                        kgrid1=self.ctx.converge.settings.kgrid[1],
-                        kgrid2=self.ctx.converge.settings.kgrid[2],
-                        pwcutoff=pwcutoff,
-                    )
-                    + inform_details
+                    f"of {k0}x{k1}x{k2} for a plane wave cutoff of {pwcutoff} eV{inform_details}"
                 )
 
     def init_pw_conv_calc_no_block(self, pw_iteration):
         """Initialize a single plane wave convergence calculation."""
         # Update the plane wave cutoff
+        settings = self.ctx.converge.settings
         pwcutoff = self.ctx.converge.pwcutoff_sampling[pw_iteration]
-        self.ctx.converge.settings.pwcutoff = pwcutoff
-        self.ctx.converge.settings.pwcutoff_list.append(pwcutoff)
+        settings.pwcutoff = pwcutoff
         parameters_dict = self.ctx.converge.parameters
 
         # Push the cut-off to the actual parameters
-        parameters_dict.update({"encut": self.ctx.converge.settings.pwcutoff})
+        parameters_dict["encut"] = pwcutoff
         self.ctx.running_pw = True
         self.ctx.running_kpoints = False
-        inform_details = self.ctx.converge.settings.get("inform_details")
-        if inform_details is None:
-            inform_details = ""
 
-        # inform user
+        # inform user - the message strings are only assembled when verbose
         if self._verbose:
-            if self.ctx.converge.settings.supplied_kmesh:
+            inform_details = settings.get("inform_details") or ""
+            if settings.supplied_kmesh:
                 self.report(
                     "running plane wave convergence test on the supplied k-point "
-                    "mesh for a plane wave cutoff of {pwcutoff} eV".format(
-                        pwcutoff=pwcutoff
-                    )
-                    + inform_details
+                    f"mesh for a plane wave cutoff of {pwcutoff} eV{inform_details}"
                 )
             else:
+                k0, k1, k2 = settings.kgrid
                 self.report(
                     "running plane wave convergence test for k-point sampling "
-                    "of {kgrid0}x{kgrid1}x{kgrid2} for a plane wave cutoff of {pwcutoff} eV".format(
-                        kgrid0=self.ctx.converge.settings.kgrid[0],
-                        kgrid1=self.ctx.converge.settings.kgrid[1],
-                        kgrid2=self.ctx.converge.settings.kgrid[2],
-                        pwcutoff=pwcutoff,
-                    )
-                    + inform_details
+                    f"of {k0}x{k1}x{k2} for a plane wave cutoff of {pwcutoff} eV{inform_details}"
                 )
 
-    def results_pw_conv_calc(self):
-        """Fetch and store the relevant convergence parameters for each plane wave calculation."""
+    def _record_conv_result(self, workchains, index, prefix, bucket):
+        """
+        Fetch the convergence quantities from one child workchain and append
+        a data row to the given bucket.
 
+        All four results_* methods share this body - only the workchain list,
+        the row prefix (cutoff or kgrid + cutoff) and the target bucket
+        differ between them.
+        """
         # Check if there is in fact a workchain present
         try:
-            workchain = self.ctx.pw_workchains[-1]
+            workchain = workchains[index]
         except IndexError:
             self.report(
                 f"There is no {self._next_workchain.__name__} in the called workchain list."
@@ -971,156 +1012,183 @@ class RapidConvergeWorkChain(WorkChain):
                 self.exit_codes.ERROR_NO_CALLED_WORKCHAIN
             )  # pylint: disable=no-member
         # Check if called workchain was successfull
-        next_workchain_exit_status = self.ctx.pw_workchains[-1].exit_status
-        next_workchain_exit_message = self.ctx.pw_workchains[-1].exit_message
+        next_workchain_exit_status = workchain.exit_status
         if next_workchain_exit_status:
             exit_code = compose_exit_code(
-                next_workchain_exit_status, next_workchain_exit_message
+                next_workchain_exit_status, workchain.exit_message
             )
             self.report(
                 "The called {}<{}> returned a non-zero exit status. "
-                "The exit status {} is inherited and this single plane-wave "
+                "The exit status {} is inherited and this single "
                 "convergence calculation has to be considered failed. Continuing "
                 "the convergence tests.".format(
                     workchain.__class__.__name__, workchain.pk, exit_code
                 )
             )
-
-        # Update plane wave iteration index.
-        self.ctx.converge.pw_iteration += 1
-        # Check if the index has an entry, if not, do not perform further
-        # calculations.
-        try:
-            self.ctx.converge.pwcutoff_sampling[self.ctx.converge.pw_iteration]
-        except IndexError:
-            self.ctx.converge.run_pw_conv_calcs = False
-
-        pwcutoff = self.ctx.converge.settings.pwcutoff
-        if not next_workchain_exit_status:
-            misc = workchain.outputs.misc.get_dict()
+            # add None entries for the failed test
+            bucket.append(prefix + [None, None, None, None])
+        else:
+            # fetch the misc dict and the band gap in one memoized call
+            misc, gap = _misc_and_gap(workchain.pk)
             # fetch total energy
             total_energy = misc["total_energies"][
-                self.ctx.inputs.parameters.converge.total_energy_type
+                self.ctx.converge.settings.total_energy_type
             ]
-
             # fetch max force
             max_force = misc["maximum_force"]
-
-            # fetch bands and occupations
-            bands = workchain.outputs.bands
-
-            # fetch band
-            _, gap = find_bandgap(bands)
-            if gap is None:
-                gap = 0.0
-            gap = float(gap)  # Ensure GAP is a float
             # Aiida cannot do VBM, yet, so set to zero for now
             max_valence_band = 0.0
-
             # add stuff to the converge context
-            self.ctx.converge.pw_data.append(
-                [pwcutoff, total_energy, max_force, max_valence_band, gap]
-            )
-        else:
-            # add None entries for the failed test
-            self.ctx.converge.pw_data.append([pwcutoff, None, None, None, None])
+            bucket.append(prefix + [total_energy, max_force, max_valence_band, gap])
 
         return self.exit_codes.NO_ERROR  # pylint: disable=no-member
 
-    def results_pw_conv_calc_no_block(self, pw_iteration):
+    def results_pw_conv_calc(self):
         """Fetch and store the relevant convergence parameters for each plane wave calculation."""
-        # Check if there is in fact a workchain present
+
+        exit_code = self._record_conv_result(
+            self.ctx.pw_workchains,
+            -1,
+            [self.ctx.converge.settings.pwcutoff],
+            self.ctx.converge.pw_data,
+        )
+        # Update plane wave iteration index.
+        self.ctx.converge.pw_iteration += 1
+        # Check if the index has an entry, if not, do not perform further
+        # calculations.
         try:
-            workchain = self.ctx.pw_workchains[pw_iteration]
+            self.ctx.converge.pwcutoff_sampling[self.ctx.converge.pw_iteration]
         except IndexError:
-            self.report(
-                f"There is no {self._next_workchain.__name__} in the called workchain list."
-            )
-            return (
-                self.exit_codes.ERROR_NO_CALLED_WORKCHAIN
-            )  # pylint: disable=no-member
-        # Check if called workchain was successfull
-        next_workchain_exit_status = self.ctx.pw_workchains[pw_iteration].exit_status
-        next_workchain_exit_message = self.ctx.pw_workchains[pw_iteration].exit_message
-        if next_workchain_exit_status:
-            exit_code = compose_exit_code(
-                next_workchain_exit_status, next_workchain_exit_message
-            )
-            self.report(
-                "The called {}<{}> returned a non-zero exit status. "
-                "The exit status {} is inherited and this single plane-wave "
-                "convergence calculation has to be considered failed. Continuing "
-                "the convergence tests.".format(
-                    workchain.__class__.__name__, workchain.pk, exit_code
-                )
-            )
-
-        pwcutoff = self.ctx.converge.settings.pwcutoff_list[pw_iteration]
-        if not next_workchain_exit_status:
-            misc = workchain.outputs.misc.get_dict()
-            # fetch total energy
-            total_energy = misc["total_energies"][
-                self.ctx.inputs.parameters.converge.total_energy_type
-            ]
-
-            # fetch max force
-            max_force = misc["maximum_force"]
-
-            # fetch bands and occupations
-            bands = workchain.outputs.bands
-
-            # fetch band
-            _, gap = find_bandgap(bands)
-            if gap is None:
-                gap = 0.0
-            # Aiida cannot do VBM, yet, so set to zero for now
-            max_valence_band = 0.0
+            self.ctx.converge.run_pw_conv_calcs = False
 
-            # add stuff to the converge context
-            self.ctx.converge.pw_data.append(
-                [pwcutoff, total_energy, max_force, max_valence_band, gap]
-            )
-        else:
-            # add None entries for the failed test
-            self.ctx.converge.pw_data.append([pwcutoff, None, None, None, None])
+        return exit_code
 
-        return self.exit_codes.NO_ERROR  # pylint: disable=no-member
+    def results_pw_conv_calc_no_block(self, pw_iteration):
+        """Fetch and store the relevant convergence parameters for each plane wave calculation."""
+        return self._record_conv_result(
+            self.ctx.pw_workchains,
+            pw_iteration,
+            [self.ctx.converge.pwcutoff_sampling[pw_iteration]],
+            self.ctx.converge.pw_data,
+        )
 
     def run_pw_conv_many(self):
         """
         Launch PW convergence calculations in parallel rather than serial.
         """
         # DEBUG - save context
-        self._debug_save_ctx("run_pw_conv_many")
+        if self._debug:
+            self._debug_save_ctx("run_pw_conv_many")
 
-        nsamples = len(self.ctx.converge.pwcutoff_sampling)
-        pw_work_uuids = []
-        for pw_id in range(nsamples):
+        converge = self.ctx.converge
+        nsamples = len(converge.pwcutoff_sampling)
+        batch_start = converge.pw_batch_start
+        if converge.pw_early_stop:
+            # Dispatch in small batches - pw_conv_not_finished stops the loop
+            # once the collected data is converged
+            batch_end = min(batch_start + self._pw_early_stop_batch, nsamples)
+        else:
+            batch_end = nsamples
+        pw_work_uuids = list(self.ctx.pw_workchains_uuids) if batch_start else []
+        # The exposed inputs are invariant across the sweep - fetch them once
+        exposed_inputs = self.exposed_inputs(self._next_workchain)
+        runnings = []
+        for pw_id in range(batch_start, batch_end):
             # This set the next pw converge calculation
             self.init_pw_conv_calc_no_block(pw_id)
-            self.init_next_workchain()
-            running = self.submit_next_workchain()
-            pw_work_uuids.append(running.uuid)
+            if not runnings:
+                # Full input preparation once per batch - the namespace walk
+                # and Dict wrapping in prepare_process_inputs are invariant
+                # between the samples
+                self.init_next_workchain(exposed_inputs)
+            else:
+                # Only the cutoff changed - rebuild just the parameters node
+                parameters = {
+                    key: value
+                    for key, value in self.ctx.inputs.parameters.items()
+                    if key != "converge"
+                }
+                self.ctx.inputs_next.parameters = get_data_node("dict", dict=parameters)
+            runnings.append(self.submit_next_workchain(report=False))
+        # One aggregated launch report for the sweep instead of one DB log
+        # entry per submission
+        if runnings:
+            self.report(
+                "launched {} {} for plane-wave cutoffs: {}".format(
+                    len(runnings),
+                    self._next_workchain.__name__,
+                    ", ".join(
+                        f"{cutoff} eV:<{running.pk}>"
+                        for cutoff, running in zip(
+                            converge.pwcutoff_sampling[batch_start:batch_end], runnings
+                        )
+                    ),
+                )
+            )
+        # Register the whole batch with the context after all submissions
+        # have gone out (to_context appends one awaitable per call)
+        pw_work_uuids.extend(running.uuid for running in runnings)
+        for running in runnings:
             self.to_context(pw_workchains=append_(running))
         self.ctx.pw_workchains_uuids = pw_work_uuids
+        converge.pw_batch_end = batch_end
 
     def run_kpoints_conv_many(self):
         """
         Launch kpoints convergence calculations in parallel rather than serial.
         """
         # DEBUG - save context
-        self._debug_save_ctx("run_pw_conv_many")
+        if self._debug:
+            self._debug_save_ctx("run_kpoints_conv_many")
 
         nsamples = len(self.ctx.converge.kgrids)
-        k_work_uuids = []
-        for pw_id in range(nsamples):
-            # This set the next pw converge calculation
-            self.init_kpoints_conv_calc_no_block(pw_id)
-            self.init_next_workchain()
-            running = self.submit_next_workchain()
-            k_work_uuids.append(running.uuid)
+        # The exposed inputs are invariant across the sweep - fetch them once
+        exposed_inputs = self.exposed_inputs(self._next_workchain)
+        runnings = []
+        for kpt_id in range(nsamples):
+            # This set the next kpoints converge calculation
+            self.init_kpoints_conv_calc_no_block(kpt_id)
+            if not runnings:
+                # Full input preparation once per sweep - only the kpoints
+                # node differs between the samples
+                self.init_next_workchain(exposed_inputs)
+            else:
+                self.ctx.inputs_next.kpoints = self.ctx.converge.kpoints
+            runnings.append(self.submit_next_workchain(report=False))
+        # One aggregated launch report for the sweep instead of one DB log
+        # entry per submission
+        if runnings:
+            self.report(
+                "launched {} {} for k-point grids: {}".format(
+                    len(runnings),
+                    self._next_workchain.__name__,
+                    ", ".join(
+                        "{}x{}x{}:<{}>".format(*kgrid, running.pk)
+                        for kgrid, running in zip(self.ctx.converge.kgrids, runnings)
+                    ),
+                )
+            )
+        # Register the whole batch with the context after all submissions
+        # have gone out
+        for running in runnings:
             self.to_context(kpoints_workchains=append_(running))
-        self.ctx.kpoints_workchains_uuids = k_work_uuids
+        self.ctx.kpoints_workchains_uuids = [running.uuid for running in runnings]
+
+    def pw_conv_not_finished(self):
+        """
+        Predicate for the plane-wave sampling loop.
+
+        Without early stopping all cutoffs go out in a single batch, so the
+        loop body runs exactly once. With early stopping the loop keeps
+        dispatching batches until the data collected so far is converged or
+        the sampling is exhausted.
+        """
+        converge = self.ctx.converge
+        if converge.pw_batch_start == 0:
+            return True
+        if converge.pw_batch_start >= len(converge.pwcutoff_sampling):
+            return False
+        return self._check_pw_converged() is None
 
     def sort_pw_workchains(self):
         """
@@ -1163,32 +1231,23 @@ class RapidConvergeWorkChain(WorkChain):
             kgrid = [element + 1 for element in kgrid]
         self.ctx.converge.settings.kgrid = kgrid
         # Update grid.
-        kpoints = get_data_class("array.kpoints")()
-        kpoints.set_kpoints_mesh(kgrid)
-        kpoints.set_cell_from_structure(self.ctx.converge.structure)
-        self.ctx.converge.kpoints = kpoints
+        self.ctx.converge.kpoints = self._get_kpoints_node(
+            kgrid, self.ctx.converge.structure
+        )
         self.ctx.running_kpoints = True
         self.ctx.running_pw = False
-        inform_details = self.ctx.converge.settings.get("inform_details")
-        if inform_details is None:
-            inform_details = ""
 
         # Update pwcutoff
-        self.ctx.inputs.parameters.update(
-            {"encut": self.ctx.converge.settings.pwcutoff}
-        )
+        pwcutoff = self.ctx.converge.settings.pwcutoff
+        self.ctx.inputs.parameters["encut"] = pwcutoff
 
-        # inform user
+        # inform user - the message strings are only assembled when verbose
         if self._verbose:
+            inform_details = self.ctx.converge.settings.get("inform_details") or ""
+            k0, k1, k2 = kgrid
             self.report(
                 "running k-point convergence test for k-point sampling "
-                "of {}x{}x{} for a plane wave cutoff of {pwcutoff} eV".format(
-                    kgrid[0],
-                    kgrid[1],
-                    kgrid[2],
-                    pwcutoff=self.ctx.converge.settings.pwcutoff,
-                )
-                + inform_details
+                f"of {k0}x{k1}x{k2} for a plane wave cutoff of {pwcutoff} eV{inform_details}"
             )
 
     def init_kpoints_conv_calc_no_block(self, kpt_id):
@@ -1197,67 +1256,36 @@ class RapidConvergeWorkChain(WorkChain):
         # Extract kgrid from generate dlist of kgrids
         kgrid = self.ctx.converge.kgrids[kpt_id]
         self.ctx.converge.settings.kgrid = kgrid
-        # settings.kgrid_list may be redundant, keep if for now
-        # for consistency
-        self.ctx.converge.settings.kgrid_list.append(kgrid)
         # Update grid.
-        kpoints = get_data_class("array.kpoints")()
-        kpoints.set_kpoints_mesh(kgrid)
-        kpoints.set_cell_from_structure(self.ctx.converge.structure)
-        self.ctx.converge.kpoints = kpoints
+        self.ctx.converge.kpoints = self._get_kpoints_node(
+            kgrid, self.ctx.converge.structure
+        )
         self.ctx.running_kpoints = True
         self.ctx.running_pw = False
-        inform_details = self.ctx.converge.settings.get("inform_details")
-        if inform_details is None:
-            inform_details = ""
 
         # Make sure the cutoff is also up-to-date
-        self.ctx.inputs.parameters.update(
-            {"encut": self.ctx.converge.settings.pwcutoff}
-        )
+        pwcutoff = self.ctx.converge.settings.pwcutoff
+        self.ctx.inputs.parameters["encut"] = pwcutoff
 
-        # inform user
+        # inform user - the message strings are only assembled when verbose
         if self._verbose:
+            inform_details = self.ctx.converge.settings.get("inform_details") or ""
+            k0, k1, k2 = kgrid
             self.report(
                 "running k-point convergence test for k-point sampling "
-                "of {}x{}x{} for a plane wave cutoff of {pwcutoff} eV".format(
-                    kgrid[0],
-                    kgrid[1],
-                    kgrid[2],
-                    pwcutoff=self.ctx.converge.settings.pwcutoff,
-                )
-                + inform_details
+                f"of {k0}x{k1}x{k2} for a plane wave cutoff of {pwcutoff} eV{inform_details}"
             )
 
     def results_kpoints_conv_calc(self):
         """Fetch and store the relevant convergence parameters for each k-point grid calculation."""
 
-        try:
-            workchain = self.ctx.kpoints_workchains[-1]
-        except IndexError:
-            self.report(
-                f"There is no {self._next_workchain.__name__} in the called workchain list."
-            )
-            return (
-                self.exit_codes.ERROR_NO_CALLED_WORKCHAIN
-            )  # pylint: disable=no-member
-
-        # Check if child workchain was successfull
-        next_workchain_exit_status = self.ctx.kpoints_workchains[-1].exit_status
-        next_workchain_exit_message = self.ctx.kpoints_workchains[-1].exit_message
-        if next_workchain_exit_status:
-            exit_code = compose_exit_code(
-                next_workchain_exit_status, next_workchain_exit_message
-            )
-            self.report(
-                "The called {}<{}> returned a non-zero exit status. "
-                "The exit status {} is inherited and this single plane-wave "
-                "convergence calculation has to be considered failed. Continuing "
-                "the convergence tests.".format(
-                    workchain.__class__.__name__, workchain.pk, exit_code
-                )
-            )
-
+        kgrid = self.ctx.converge.settings.kgrid
+        exit_code = self._record_conv_result(
+            self.ctx.kpoints_workchains,
+            -1,
+            [kgrid[0], kgrid[1], kgrid[2], self.ctx.converge.settings.pwcutoff],
+            self.ctx.converge.k_data,
+        )
         # Update kpoints iteration index
         self.ctx.converge.kpoints_iteration += 1
         # Check if the index has an entry, if not, do not perform further
@@ -1267,118 +1295,18 @@ class RapidConvergeWorkChain(WorkChain):
         except IndexError:
             self.ctx.converge.run_kpoints_conv_calcs = False
 
-        kgrid = self.ctx.converge.settings.kgrid
-        pwcutoff = self.ctx.converge.settings.pwcutoff
-        if not next_workchain_exit_status:
-            misc = workchain.outputs.misc.get_dict()
-            # fetch total energy
-            total_energy = misc["total_energies"][
-                self.ctx.inputs.parameters.converge.total_energy_type
-            ]
-
-            # fetch max force
-            max_force = misc["maximum_force"]
-
-            # fetch bands and occupations
-            bands = workchain.outputs.bands
-            # fetch band
-            _, gap = find_bandgap(bands)
-            if gap is None:
-                gap = 0.0
-            # Aiida cannot do VBM, yet, so set to zero for now
-            max_valence_band = 0.0
-
-            # add stuff to the converge context
-            self.ctx.converge.k_data.append(
-                [
-                    kgrid[0],
-                    kgrid[1],
-                    kgrid[2],
-                    pwcutoff,
-                    total_energy,
-                    max_force,
-                    max_valence_band,
-                    gap,
-                ]
-            )
-        else:
-            # add None entries for the failed test
-            self.ctx.converge.k_data.append(
-                [kgrid[0], kgrid[1], kgrid[2], pwcutoff, None, None, None, None]
-            )
-
-        return self.exit_codes.NO_ERROR  # pylint: disable=no-member
+        return exit_code
 
     def results_kpoints_conv_calc_no_block(self, kpt_id):
         """Fetch and store the relevant convergence parameters for each k-point grid calculation."""
 
-        try:
-            workchain = self.ctx.kpoints_workchains[kpt_id]
-        except IndexError:
-            self.report(
-                f"There is no {self._next_workchain.__name__} in the called workchain list."
-            )
-            return (
-                self.exit_codes.ERROR_NO_CALLED_WORKCHAIN
-            )  # pylint: disable=no-member
-
-        # Check if child workchain was successfull
-        next_workchain_exit_status = self.ctx.kpoints_workchains[kpt_id].exit_status
-        next_workchain_exit_message = self.ctx.kpoints_workchains[kpt_id].exit_message
-        if next_workchain_exit_status:
-            exit_code = compose_exit_code(
-                next_workchain_exit_status, next_workchain_exit_message
-            )
-            self.report(
-                "The called {}<{}> returned a non-zero exit status. "
-                "The exit status {} is inherited and this single plane-wave "
-                "convergence calculation has to be considered failed. Continuing "
-                "the convergence tests.".format(
-                    workchain.__class__.__name__, workchain.pk, exit_code
-                )
-            )
-
-        kgrid = self.ctx.converge.settings.kgrid_list[kpt_id]
-        pwcutoff = self.ctx.converge.settings.pwcutoff
-        if not next_workchain_exit_status:
-            misc = workchain.outputs.misc.get_dict()
-            # fetch total energy
-            total_energy = misc["total_energies"][
-                self.ctx.inputs.parameters.converge.total_energy_type
-            ]
-
-            # fetch max force
-            max_force = misc["maximum_force"]
-
-            # fetch bands and occupations
-            bands = workchain.outputs.bands
-            # fetch band
-            _, gap = find_bandgap(bands)
-            if gap is None:
-                gap = 0.0
-            # Aiida cannot do VBM, yet, so set to zero for now
-            max_valence_band = 0.0
-
-            # add stuff to the converge context
-            self.ctx.converge.k_data.append(
-                [
-                    kgrid[0],
-                    kgrid[1],
-                    kgrid[2],
-                    pwcutoff,
-                    total_energy,
-                    max_force,
-                    max_valence_band,
-                    gap,
-                ]
-            )
-        else:
-            # add None entries for the failed test
-            self.ctx.converge.k_data.append(
-                [kgrid[0], kgrid[1], kgrid[2], pwcutoff, None, None, None, None]
-            )
-
-        return self.exit_codes.NO_ERROR  # pylint: disable=no-member
+        kgrid = self.ctx.converge.kgrids[kpt_id]
+        return self._record_conv_result(
+            self.ctx.kpoints_workchains,
+            kpt_id,
+            [kgrid[0], kgrid[1], kgrid[2], self.ctx.converge.settings.pwcutoff],
+            self.ctx.converge.k_data,
+        )
 
     def analyze_pw_after_comp(self):
         """Return True if we are running compressed convergence tests."""
@@ -1412,9 +1340,10 @@ class RapidConvergeWorkChain(WorkChain):
         """Save the PW workchains peroformed in parallel"""
         # Sort ctx.pw_workchains
         self.sort_pw_workchains()
-        nsamples = len(self.ctx.converge.pwcutoff_sampling)
-        for pw_id in range(nsamples):
+        converge = self.ctx.converge
+        for pw_id in range(converge.pw_batch_start, converge.pw_batch_end):
             self.results_pw_conv_calc_no_block(pw_id)
+        converge.pw_batch_start = converge.pw_batch_end
 
     def analyze_pw_conv_many(self):
         """Analyze the plane wave convergence and store it if need be."""
@@ -1436,9 +1365,6 @@ class RapidConvergeWorkChain(WorkChain):
                 self.ctx.converge.settings.pwcutoff = self.ctx.converge.pw_data[-1][0]
             else:
                 self.ctx.converge.settings.pwcutoff = pwcutoff
-        # Reset lists
-        self.ctx.converge.settings.pwcutoff_list = []
-        self.ctx.converge.settings.kgrid_list = []
 
     def save_kpoints_conv_many(self):
         """Analyze the plane wave convergence and store it if need be."""
@@ -1460,8 +1386,8 @@ class RapidConvergeWorkChain(WorkChain):
         """Analyze convergence and store its parameters."""
 
         settings = self.ctx.converge.settings
-        displace = self.ctx.inputs.parameters.converge.displace
-        compress = self.ctx.inputs.parameters.converge.compress
+        displace = settings.displace
+        compress = settings.compress
 
         # Notify the user
         if self._verbose:
@@ -1658,14 +1584,12 @@ class RapidConvergeWorkChain(WorkChain):
             )
         else:
             kgrid_diff_displacement = None
-        # Calculate diffs for the plane wave cutoff
+        # Calculate diffs for the plane wave cutoff - one vectorized
+        # subtraction over the stacked rows; the diffed rows are written back
+        # so store_conv exposes them like the old in-place update did
         if pwcutoff_org is None:
-            pw_data = pw_data_displacement
-            for index, _ in enumerate(pw_data):
-                pw_data[index][1:] = [
-                    pw_data_displacement[index][j + 1] - pw_data_org[index][j + 1]
-                    for j in range(len(pw_data_displacement[0]) - 1)
-                ]
+            pw_data = _relative_rows(pw_data_displacement, pw_data_org, 1)
+            self.ctx.converge.pw_data_displacement = pw_data
             pwcutoff_diff_displacement = self._check_pw_converged(
                 pw_data, cutoff_type, cutoff_value_r
             )
@@ -1674,12 +1598,8 @@ class RapidConvergeWorkChain(WorkChain):
 
         # Then for the k points
         if kgrid_org is None and not settings.supplied_kmesh:
-            k_data = k_data_displacement
-            for index, _ in enumerate(k_data_displacement):
-                k_data[index][4:] = [
-                    k_data_displacement[index][j + 4] - k_data_org[index][j + 4]
-                    for j in range(len(k_data_displacement[0]) - 4)
-                ]
+            k_data = _relative_rows(k_data_displacement, k_data_org, 4)
+            self.ctx.converge.k_data_displacement = k_data
             kgrid_diff_displacement = self._check_kpoints_converged(
                 k_data, cutoff_type, cutoff_value_r
             )
@@ -1768,14 +1688,11 @@ class RapidConvergeWorkChain(WorkChain):
             )
         else:
             kgrid_diff_comp = None
-        # Calculate diffs for pwcutoff
+        # Calculate diffs for pwcutoff - same vectorized subtraction and
+        # write-back as in the displacement analysis
         if pwcutoff_org is None:
-            pw_data = pw_data_comp
-            for index, _ in enumerate(pw_data):
-                pw_data[index][1:] = [
-                    pw_data_comp[index][j + 1] - pw_data_org[index][j + 1]
-                    for j in range(len(pw_data_comp[0]) - 1)
-                ]
+            pw_data = _relative_rows(pw_data_comp, pw_data_org, 1)
+            self.ctx.converge.pw_data_comp = pw_data
             pwcutoff_diff_comp = self._check_pw_converged(
                 pw_data, cutoff_type, cutoff_value_r
             )
@@ -1783,12 +1700,8 @@ class RapidConvergeWorkChain(WorkChain):
             pwcutoff_diff_comp = pwcutoff_org
         # Then for the k points
         if kgrid_org is None and not settings.supplied_kmesh:
-            k_data = k_data_comp
-            for index, _ in enumerate(k_data_comp):
-                k_data[index][4:] = [
-                    k_data_comp[index][j + 4] - k_data_org[index][j + 4]
-                    for j in range(len(k_data_comp[0]) - 4)
-                ]
+            k_data = _relative_rows(k_data_comp, k_data_org, 4)
+            self.ctx.converge.k_data_comp = k_data
             kgrid_diff_comp = self._check_kpoints_converged(
                 k_data, cutoff_type, cutoff_value_r
             )
@@ -1901,27 +1814,21 @@ class RapidConvergeWorkChain(WorkChain):
         # otherwise return None
         if len(pw_data) < 2:
             return None
-        # Analyze which pwcutoff to use further (cutoff_type sets which parameter)
-        pwcutoff_okey = False
-        index = 0
+        # Analyze which pwcutoff to use further (cutoff_type sets which parameter).
+        # The cutoff type maps onto a column index, so the consecutive-delta
+        # scan is a single vectorized diff over that column.
         criteria = self._ALLOWED_CUTOFF_TYPES[cutoff_type]
         # Here we only check two consecutive steps, consider to at least check three,
         # and pick the first if both steps are within the criteria
-        for pwcutoff in range(1, len(pw_data)):
-            delta = abs(
-                pw_data[pwcutoff][criteria + 1] - pw_data[pwcutoff - 1][criteria + 1]
-            )
-            if delta < cutoff_value:
-                pwcutoff_okey = True
-                index = pwcutoff
-                break
-        if not pwcutoff_okey:
+        column = np.asarray([row[criteria + 1] for row in pw_data], dtype=np.float64)
+        hits = np.flatnonzero(np.abs(np.diff(column)) < cutoff_value)
+        if hits.size == 0:
             # if self._verbose:
             #     self.report('Could not obtain convergence for {cutoff_type} with a cutoff '
             #                 'parameter of {cutoff_value}'.format(cutoff_type=cutoff_type, cutoff_value=cutoff_value))
             return None
 
-        return pw_data[index][0]
+        return pw_data[int(hits[0]) + 1][0]
 
     def _check_kpoints_converged(
         self, k_data=None, cutoff_type=None, cutoff_value=None
@@ -1946,24 +1853,19 @@ class RapidConvergeWorkChain(WorkChain):
         # otherwise return None
         if len(k_data) < 2:
             return None
-        # now analyze which k-point grid to use
-        k_cut_okey = False
-        index = 0
+        # now analyze which k-point grid to use - same vectorized
+        # consecutive-delta scan as in _check_pw_converged
         criteria = self._ALLOWED_CUTOFF_TYPES[cutoff_type]
         # Here we only check two consecutive steps, consider to at least check three,
         # and pick the first if both steps are within the criteria
-        for k in range(1, len(k_data)):
-            delta = abs(k_data[k][criteria + 4] - k_data[k - 1][criteria + 4])
-            if delta < cutoff_value:
-                k_cut_okey = True
-                index = k
-                break
-        if not k_cut_okey:
+        column = np.asarray([row[criteria + 4] for row in k_data], dtype=np.float64)
+        hits = np.flatnonzero(np.abs(np.diff(column)) < cutoff_value)
+        if hits.size == 0:
             # self.report('Could not find a dense enough grid to obtain a {cutoff_type} '
             #             'cutoff of {cutoff_value})'.format(cutoff_type=cutoff_type, cutoff_value=cutoff_value))
             return None
 
-        return k_data[index][0:3]
+        return k_data[int(hits[0]) + 1][0:3]
 
     def verify_next_workchain(self):
         """Verify and inherit exit status from child workchains."""
@@ -2039,13 +1941,21 @@ class RapidConvergeWorkChain(WorkChain):
             self.ctx.converge.structure, volume_change
         )
         # Make sure we also reset the reciprocal cell
-        kpoints = get_data_class("array.kpoints")()
+        kpoints = _KPOINTS_CLS()
         kpoints.set_kpoints_mesh([1, 1, 1])
         kpoints.set_cell_from_structure(comp_structure)
         self.ctx.converge.kpoints = kpoints
 
         return comp_structure
 
+    def _debug_dir(self):
+        """Return the debug checkpoint directory, creating it on first use."""
+        if self.ctx.debug.wkdir is None:
+            self.ctx.debug.wkdir = mkdtemp()
+            if self._verbose:
+                self.report(f"Debug checkpoint dir: {self.ctx.debug.wkdir}")
+        return self.ctx.debug.wkdir
+
     def _debug_save_ctx(self, label):
         """
         Serlize context for debugging
@@ -2054,7 +1964,7 @@ class RapidConvergeWorkChain(WorkChain):
 
         from aiida.orm.utils.serialize import serialize
 
-        wkdir = Path(self.ctx.debug.wkdir)
+        wkdir = Path(self._debug_dir())
         label_counts = self.ctx.debug.label_counts
         if label in label_counts:
             label_counts[label] += 1
@@ -2066,6 +1976,67 @@ class RapidConvergeWorkChain(WorkChain):
             fh.write(serialize(self.ctx))
 
 
+def _relative_rows(data, data_org, start_col):
+    """
+    Return rows where the columns from start_col onwards hold the difference
+    between the two datasets, keeping the leading identification columns.
+
+    Only the common row prefix is diffed, like the zip of the per-row loop
+    this replaces: with early stopping the original sweep may hold fewer
+    cutoffs than the full displaced/compressed sampling, and the surplus rows
+    have no counterpart to subtract.
+
+    A single vectorized subtraction over the stacked rows replaces the
+    per-row/per-column Python loops of the relative-convergence analysis.
+    """
+    nrows = min(len(data), len(data_org))
+    arr = np.asarray(data[:nrows], dtype=np.float64)
+    org = np.asarray(data_org[:nrows], dtype=np.float64)
+    arr[:, start_col:] -= org[:, start_col:]
+    return arr.tolist()
+
+
+@lru_cache(maxsize=256)
+def _misc_and_gap(pk):
+    """
+    Fetch the misc output dict and the band gap of a finished child workchain.
+
+    Memoized by pk - the outputs of a sealed workchain are immutable, and the
+    results-gathering paths may revisit the same child (e.g. after a restart),
+    each time re-deserializing the misc dict and re-scanning the band arrays.
+    The cache is bounded: a daemon worker runs many convergence workchains per
+    interpreter and the misc dicts are not small.
+    """
+    workchain = load_node(pk)
+    misc = workchain.outputs.misc.get_dict()
+    return misc, _cached_bandgap(workchain.outputs.bands.pk)
+
+
+@lru_cache(maxsize=256)
+def _cached_bandgap(bands_pk):
+    """
+    Band gap of a stored BandsData node, memoized separately from the owning
+    workchain - with AiiDA-level caching several children can share one bands
+    node, so the array scan runs at most once per distinct node.
+    """
+    _, gap = find_bandgap(load_node(bands_pk))
+    return 0.0 if gap is None else float(gap)
+
+
+@lru_cache(maxsize=None)
+def _fetch_k_grid_cached(rec_cell_bytes, spacing):
+    """Memoized fetch_k_grid - arrays are passed as raw bytes to be hashable."""
+    rec_cell = np.frombuffer(rec_cell_bytes, dtype=np.float64).reshape(3, 3)
+    return tuple(fetch_k_grid(rec_cell, spacing))
+
+
+def _copy_rows(data):
+    """Snapshot a list of result rows with one-level copies."""
+    if data is None:
+        return None
+    return [list(row) for row in data]
+
+
 def default_array(name, array):
     """Used to set ArrayData for spec.input."""
     array_cls = get_data_node("array")
@@ -0,0 +1,29 @@
+"""
+Tests for the rapid convergence workchain helpers.
+"""
+import pytest
+
+from aiida_user_addons.vworkflows.converge import _relative_rows
+
+
+def test_relative_rows():
+    """The trailing columns must hold the difference between the datasets"""
+    data = [[300.0, 1.0, 2.0], [350.0, 3.0, 4.0]]
+    data_org = [[300.0, 0.5, 0.5], [350.0, 1.0, 1.0]]
+    rows = _relative_rows(data, data_org, 1)
+    assert rows == [[300.0, 0.5, 1.5], [350.0, 2.0, 3.0]]
+
+
+def test_relative_rows_early_stop():
+    """
+    With early stopping plus displacement/compression the original sweep can
+    hold fewer cutoffs than the full relative sampling - only the common row
+    prefix should be diffed, like the per-row zip this helper replaced.
+    """
+    data = [[300.0, 1.0], [350.0, 2.0], [400.0, 3.0]]
+    data_org = [[300.0, 0.5], [350.0, 0.5]]
+    rows = _relative_rows(data, data_org, 1)
+    assert rows == [[300.0, 0.5], [350.0, 1.5]]
+    # The shorter dataset may also be the displaced one
+    rows = _relative_rows(data_org, data, 1)
+    assert rows == [[300.0, -0.5], [350.0, -1.5]]
@@ -3,6 +3,7 @@ Test for the sumo related code
 """
 from pathlib import Path
 
+import numpy as np
 import pytest
 from aiida.orm import load_node
 
@@ -40,3 +41,28 @@ def test_read_pdos(castep_pdos_calc):
     assert "Mn" in pdos
     assert "dx2" in pdos["Mn"]
     assert dos.energies[0] == pytest.approx(-66.53742681)
+
+
+def test_read_dos_density(castep_pdos_calc):
+    """The binned DOS must only count eigenvalues inside the sampling window"""
+    dos, _ = read_dos_castep(castep_pdos_calc, total_only=True)
+
+    # Reconstruct the bin edges from the returned energy axis
+    half_width = (dos.energies[1] - dos.energies[0]) / 2
+    emin = dos.energies[0] - half_width
+    emax = dos.energies[-1] + half_width
+
+    # The total density mass must equal the kpoint-weight mass of the
+    # eigenvalues that fall inside [emin, emax] - out-of-window eigenvalues
+    # are dropped, not piled into the edge bins
+    bands = castep_pdos_calc.outputs.output_bands
+    eigenvalues = bands.get_bands()
+    _, weights = bands.get_kpoints(also_weights=True)
+    if eigenvalues.ndim == 2:
+        eigenvalues = eigenvalues[None, :, :]
+    weight_mass = np.broadcast_to(weights[None, :, None], eigenvalues.shape)
+    in_window = (eigenvalues >= emin) & (eigenvalues <= emax)
+    expected = weight_mass[in_window].sum()
+
+    total = sum(density.sum() for density in dos.densities.values())
+    assert total == pytest.approx(expected)